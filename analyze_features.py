@@ -8,8 +8,9 @@ import matplotlib.pyplot as plt
 print("Analyzing Feature Importance with SHAP...")
 
 model, model_name = model_registry.get_best_model(metric='rmse')
-df = feature_store.get_processed_features()
-X, y = prepare_for_training(df)
+model_features = model_registry.get_model_features(model_name)
+df = feature_store.get_processed_features(columns=model_features + ['aqi'] if model_features else None)
+X, y = prepare_for_training(df, features=model_features)
 
 X_sample = X.sample(min(500, len(X)), random_state=42)
 
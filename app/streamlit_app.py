@@ -119,6 +119,40 @@ def load_predictions():
         st.error(f"Error: {e}")
         return None
 
+# Load materialized daily stats (actual or predicted) for `days` days from start_date
+@st.cache_data(ttl=600)
+def load_daily_stats(source, start_date, days):
+    try:
+        from src.storage.views import aggregate_views
+        
+        df = aggregate_views.daily(
+            source,
+            cities=[Config.CITY_NAME],
+            start_date=start_date,
+            end_date=start_date + timedelta(days=days - 1)
+        )
+        return df if not df.empty else None
+    except Exception as e:
+        st.error(f"Error: {e}")
+        return None
+
+# Load long-range history (daily rollups, not raw hours)
+@st.cache_data(ttl=3600)
+def load_history(days=365):
+    try:
+        from src.storage.feature_store import feature_store
+        
+        df = feature_store.get_rollups(
+            'daily',
+            start_date=datetime.now() - timedelta(days=days),
+            cities=[Config.CITY_NAME],
+            columns=['aqi']
+        )
+        return df if not df.empty else None
+    except Exception as e:
+        st.error(f"Error: {e}")
+        return None
+
 # SECTION 1: CURRENT AQI
 st.markdown('<div class="current-box">', unsafe_allow_html=True)
 st.markdown("## 🔵 Current Air Quality (Real-Time)")
@@ -141,14 +175,21 @@ if current_data is not None and not current_data.empty:
     with col4:
         st.metric("As of", current_time.strftime('%H:%M'))
     
+    # Stored daily stats for today; the fetched hours until the view has any
+    today = load_daily_stats('actual', datetime.now().replace(hour=0, minute=0, second=0, microsecond=0), 1)
+    if today is not None:
+        today_min, today_mean, today_max = today.iloc[0][['min', 'mean', 'max']]
+    else:
+        today_min, today_mean, today_max = current_data['aqi'].agg(['min', 'mean', 'max'])
+    
     st.markdown("**Today's Statistics:**")
     col_a, col_b, col_c = st.columns(3)
     with col_a:
-        st.metric("Min", f"{current_data['aqi'].min():.0f}")
+        st.metric("Min", f"{today_min:.0f}")
     with col_b:
-        st.metric("Average", f"{current_data['aqi'].mean():.0f}")
+        st.metric("Average", f"{today_mean:.0f}")
     with col_c:
-        st.metric("Max", f"{current_data['aqi'].max():.0f}")
+        st.metric("Max", f"{today_max:.0f}")
 else:
     st.warning("⚠️ Unable to fetch current AQI")
 
@@ -196,9 +237,12 @@ if predictions is not None and not predictions.empty:
     # Daily summary
     st.markdown("### 📋 Daily Summary")
     
-    predictions['date'] = predictions['timestamp'].dt.date
-    daily = predictions.groupby('date')['predicted_aqi'].agg(['min', 'max', 'mean']).round(0)
-    daily = daily.reset_index().head(3)
+    first_day = predictions['timestamp'].min().normalize()
+    daily = load_daily_stats('predicted', first_day, 3)
+    if daily is None:
+        predictions['date'] = predictions['timestamp'].dt.date
+        daily = predictions.groupby('date')['predicted_aqi'].agg(['min', 'max', 'mean']).reset_index()
+    daily = daily[['date', 'min', 'max', 'mean']].round(0).head(3)
     
     cols = st.columns(len(daily))
     for idx, row in daily.iterrows():
@@ -237,5 +281,33 @@ else:
 
 st.markdown('</div>', unsafe_allow_html=True)
 
+st.markdown("---")
+
+# SECTION 3: HISTORY
+st.markdown("## 📅 AQI History (Past Year)")
+
+history = load_history()
+
+if history is not None:
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=history['period_start'], y=history['aqi_max'],
+        mode='lines', line=dict(width=0), showlegend=False
+    ))
+    fig.add_trace(go.Scatter(
+        x=history['period_start'], y=history['aqi_min'],
+        mode='lines', line=dict(width=0), fill='tonexty',
+        fillcolor='rgba(33, 150, 243, 0.2)', name='Daily range'
+    ))
+    fig.add_trace(go.Scatter(
+        x=history['period_start'], y=history['aqi_mean'],
+        mode='lines', name='Daily average', line=dict(color='#2196F3', width=2)
+    ))
+    fig.update_layout(xaxis_title="Date", yaxis_title="AQI", height=400)
+    
+    st.plotly_chart(fig, use_container_width=True)
+else:
+    st.info("ℹ️ No history available yet")
+
 st.markdown("---")
 st.markdown('<p style="text-align:center;color:gray">Built with Streamlit & MongoDB | Open-Meteo API</p>', unsafe_allow_html=True)
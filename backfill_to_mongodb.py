@@ -1,41 +1,49 @@
 import logging
 logging.basicConfig(level=logging.INFO)
 
-from src.data.fetch_data import fetch_historical_data
-from src.data.feature_engineering import create_features
+import argparse
+from datetime import datetime, date, timedelta
+
+from src.pipelines.feature_pipeline import backfill_feature_store
 from src.storage.feature_store import feature_store
+from src.utils.config import Config
+
+parser = argparse.ArgumentParser(description="Backfill historical data to MongoDB in resumable windows")
+parser.add_argument('--months', type=int, default=Config.HISTORICAL_MONTHS,
+                    help='Months of history ending 14 days ago (ignored if --start is given)')
+parser.add_argument('--start', type=date.fromisoformat, help='Start date (YYYY-MM-DD)')
+parser.add_argument('--end', type=date.fromisoformat, help='End date (YYYY-MM-DD)')
+parser.add_argument('--window-days', type=int, default=Config.BACKFILL_WINDOW_DAYS)
+parser.add_argument('--workers', type=int, default=Config.BACKFILL_MAX_WORKERS)
+parser.add_argument('--reset', action='store_true', help='Ignore the checkpoint and start over')
+args = parser.parse_args()
+
+# Archive API has 2-week delay for finalized data
+end_date = args.end or (datetime.now().date() - timedelta(days=14))
+start_date = args.start or (end_date - timedelta(days=30 * args.months))
 
 print("Backfilling Historical Data to MongoDB...")
 print("="*50)
-
-# Fetch 4 months of historical data
-print("\nFetching 4 months of historical data...")
-df_historical = fetch_historical_data(months=4)
-
-print(f"✅ Fetched {len(df_historical)} historical records")
-print(f"Date range: {df_historical['timestamp'].min()} to {df_historical['timestamp'].max()}")
-
-# Save raw historical data
-print("\nSaving raw historical data to MongoDB...")
-success = feature_store.save_raw_data(df_historical)
-
-if success:
-    print("✅ Raw historical data saved")
-else:
-    print("❌ Failed to save raw data")
-
-# Create features
-print("\nCreating features from historical data...")
-df_features = create_features(df_historical)
-
-print(f"✅ Created {len(df_features)} feature records")
-
-# Save processed features
-print("\nSaving processed features to MongoDB...")
-success = feature_store.save_processed_features(df_features)
-
-if success:
-    print("✅ Processed features saved")
-    print(f"\n🎉 Backfill complete! {len(df_features)} training samples ready in MongoDB")
+print(f"\nRange: {start_date} to {end_date} "
+      f"({args.window_days}-day windows, {args.workers} workers)")
+
+summary = backfill_feature_store(
+    start_date,
+    end_date,
+    window_days=args.window_days,
+    max_workers=args.workers,
+    reset=args.reset
+)
+
+print(f"\n✅ {summary['completed']}/{summary['windows']} windows stored "
+      f"({summary['rows_fetched']} records fetched this run)")
+
+# Backfill writes go straight to MongoDB; drain anything an earlier run left spooled
+if not feature_store.flush_writes(timeout=Config.WRITE_SPOOL_DRAIN_SECONDS):
+    print("⚠️ Write spool not drained; rerun to flush the remaining writes")
+
+if summary['failed']:
+    print(f"❌ Failed windows: {', '.join(summary['failed'])}")
+    print("Rerun this script to resume from the checkpoint")
 else:
-    print("❌ Failed to save processed features")
\ No newline at end of file
+    print("\n🎉 Backfill complete!")
@@ -0,0 +1,54 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from src.data.aqi import compute_aqi, ALL_POLLUTANTS
+from src.data.fetch_data import calculate_aqi
+
+parser = argparse.ArgumentParser(description="Benchmark vectorized AQI against row-wise calculate_aqi")
+parser.add_argument('--rows', type=int, default=10_000_000, help='Rows for the vectorized run')
+parser.add_argument('--baseline-rows', type=int, default=200_000,
+                    help='Rows for the row-wise run (extrapolated to --rows)')
+args = parser.parse_args()
+
+print("Benchmarking AQI calculation...")
+print("=" * 50)
+
+rng = np.random.default_rng(42)
+df = pd.DataFrame({
+    'pm2_5': rng.gamma(2.0, 30.0, args.rows),
+    'pm10': rng.gamma(2.0, 60.0, args.rows),
+    'ozone': rng.gamma(2.0, 40.0, args.rows),
+    'no2': rng.gamma(2.0, 20.0, args.rows),
+    'so2': rng.gamma(2.0, 10.0, args.rows),
+    'co': rng.gamma(2.0, 300.0, args.rows),
+})
+# Sprinkle in missing readings
+df.loc[df.sample(frac=0.01, random_state=42).index, 'pm2_5'] = np.nan
+
+# Row-wise baseline (current fetch_data path) on a sample
+sample = df.head(args.baseline_rows)
+start = time.perf_counter()
+baseline = sample.apply(lambda row: calculate_aqi(row['pm2_5'], row['pm10']), axis=1)
+baseline_time = time.perf_counter() - start
+baseline_projected = baseline_time * args.rows / len(sample)
+
+# Vectorized, same pollutants as the baseline
+start = time.perf_counter()
+result = compute_aqi(df)
+vector_time = time.perf_counter() - start
+
+# Vectorized, all six pollutants
+start = time.perf_counter()
+compute_aqi(df, pollutants=ALL_POLLUTANTS)
+vector_all_time = time.perf_counter() - start
+
+max_diff = np.abs(result['aqi'].to_numpy()[:len(sample)] - baseline.to_numpy()).max()
+
+print(f"\nRow-wise calculate_aqi:   {baseline_time:.2f}s for {len(sample):,} rows "
+      f"(~{baseline_projected:.1f}s projected for {args.rows:,})")
+print(f"Vectorized (PM2.5/PM10):  {vector_time:.2f}s for {args.rows:,} rows")
+print(f"Vectorized (6 pollutants): {vector_all_time:.2f}s for {args.rows:,} rows")
+print(f"\nSpeedup: {baseline_projected / vector_time:.0f}x")
+print(f"Max abs difference vs calculate_aqi: {max_diff:.2e}")
@@ -0,0 +1,60 @@
+import argparse
+import time
+import bson
+import numpy as np
+import pandas as pd
+
+from src.data.feature_engineering import create_features, FEATURE_DTYPES
+from src.data.schema import decode_records
+from src.storage.buckets import DayBuckets
+
+parser = argparse.ArgumentParser(description="Benchmark hourly vs day-bucketed feature documents")
+parser.add_argument('--cities', type=int, default=5, help='Number of cities')
+parser.add_argument('--days', type=int, default=365, help='Days of hourly data per city')
+args = parser.parse_args()
+
+print("Benchmarking day-bucketed documents...")
+print("=" * 50)
+
+rng = np.random.default_rng(42)
+hours = pd.date_range('2024-01-01', periods=args.days * 24, freq='h')
+raw = pd.DataFrame({
+    'city': np.repeat([f"city_{i:03d}" for i in range(args.cities)], len(hours)),
+    'timestamp': np.tile(hours, args.cities)
+})
+for col in ['pm10', 'pm2_5', 'co', 'no2', 'so2', 'ozone', 'dust',
+            'uv_index', 'temperature', 'humidity', 'wind_speed', 'aqi']:
+    raw[col] = rng.gamma(2.0, 20.0, len(raw)).astype('float32')
+raw['dominant_pollutant'] = 'pm2_5'
+features = create_features(raw)
+print(f"Processed features: {len(features):,} rows x {features.shape[1]} columns")
+
+# Documents as each layout stores them, encoded to BSON (what Mongo stores and sends)
+hourly = [bson.encode(record) for record in features.to_dict('records')]
+buckets = DayBuckets(None, FEATURE_DTYPES)
+days = features['timestamp'].dt.floor('D')
+daily = [bson.encode(buckets.pack(city, day.to_pydatetime(), rows))
+         for (city, day), rows in features.groupby([features['city'], days])]
+
+results = {}
+for label, docs, decode in [
+    ('hourly', hourly, lambda docs: decode_records(map(bson.decode, docs), FEATURE_DTYPES)),
+    ('bucketed', daily, lambda docs: buckets.to_frame(map(bson.decode, docs))),
+]:
+    start = time.perf_counter()
+    results[label] = decode(docs)
+    elapsed = time.perf_counter() - start
+    size = sum(len(doc) for doc in docs)
+
+    print(f"\n{label}:")
+    print(f"  Documents: {len(docs):,}")
+    print(f"  BSON size: {size / 1e6:.1f} MB")
+    print(f"  Decode:    {elapsed:.2f} s")
+    results[label + '_size'] = size
+    results[label + '_time'] = elapsed
+
+same = results['hourly'].sort_values(['timestamp', 'city'], ignore_index=True).equals(results['bucketed'])
+print(f"\n✅ Frames identical: {same}")
+print(f"✅ Documents: {len(hourly) / len(daily):.0f}x fewer, "
+      f"size {results['hourly_size'] / results['bucketed_size']:.1f}x smaller, "
+      f"decode {results['hourly_time'] / results['bucketed_time']:.1f}x faster")
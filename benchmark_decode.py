@@ -0,0 +1,61 @@
+import argparse
+import json
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+from src.data.schema import AIR_QUALITY_VARIABLES, decode_hourly
+from src.utils import jsonio
+
+parser = argparse.ArgumentParser(description="Benchmark Open-Meteo response decoding")
+parser.add_argument('--years', type=int, default=10, help='Years of hourly archive data in the response')
+args = parser.parse_args()
+
+print("Benchmarking archive response decoding...")
+print("=" * 50)
+
+# Synthetic archive response shaped like Open-Meteo's
+times = pd.date_range('2000-01-01', periods=args.years * 8760, freq='h')
+rng = np.random.default_rng(42)
+hourly = {'time': times.strftime('%Y-%m-%dT%H:%M').tolist()}
+for variable in AIR_QUALITY_VARIABLES:
+    values = np.round(rng.gamma(2.0, 20.0, len(times)), 1).tolist()
+    values[::97] = [None] * len(values[::97])
+    hourly[variable] = values
+payload = json.dumps({'hourly': hourly}).encode()
+print(f"Response: {len(times):,} hours, {len(payload) / 1e6:.1f} MB")
+
+
+def decode_lists(raw):
+    """Previous path: json + dict of lists + per-string timestamp parsing"""
+    data = json.loads(raw)
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(data['hourly']['time']),
+        **{column: data['hourly'][variable] for variable, column in AIR_QUALITY_VARIABLES.items()}
+    })
+
+
+def decode_columns(raw):
+    """Schema-driven path: fast parser + typed columns + int64 time range"""
+    data = jsonio.loads(raw)
+    return pd.DataFrame(decode_hourly(data['hourly'], AIR_QUALITY_VARIABLES))
+
+
+for label, decode in [('dict of lists', decode_lists), ('schema columns', decode_columns)]:
+    decode(payload)  # warm up
+
+    start = time.perf_counter()
+    for _ in range(3):
+        df = decode(payload)
+    elapsed = (time.perf_counter() - start) / 3
+
+    tracemalloc.start()
+    df = decode(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"\n{label}:")
+    print(f"  Decode time: {elapsed * 1000:.0f} ms")
+    print(f"  Peak memory: {peak / 1e6:.1f} MB")
+    print(f"  Frame size:  {df.memory_usage(deep=True).sum() / 1e6:.1f} MB")
@@ -0,0 +1,48 @@
+import os
+import argparse
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+parser = argparse.ArgumentParser(description="Benchmark feature cache reads against recomputation")
+parser.add_argument('--cities', type=int, default=100, help='Number of cities')
+parser.add_argument('--days', type=int, default=365, help='Days of hourly data per city')
+args = parser.parse_args()
+
+# Fresh cache directory so the first run is always a miss
+os.environ['FEATURE_CACHE_DIR'] = tempfile.mkdtemp(prefix='feature_cache_')
+os.environ['FEATURE_CACHE_ENABLED'] = 'true'
+
+from src.data.feature_engineering import create_features
+from src.data.feature_cache import feature_cache
+
+print("Benchmarking feature cache...")
+print("=" * 50)
+
+rng = np.random.default_rng(42)
+hours = pd.date_range('2024-01-01', periods=args.days * 24, freq='h')
+df = pd.DataFrame({
+    'city': np.repeat([f"city_{i:03d}" for i in range(args.cities)], len(hours)),
+    'timestamp': np.tile(hours, args.cities)
+})
+for col in ['pm10', 'pm2_5', 'co', 'no2', 'so2', 'ozone', 'dust',
+            'uv_index', 'temperature', 'humidity', 'wind_speed', 'aqi']:
+    df[col] = rng.gamma(2.0, 20.0, len(df)).astype('float32')
+print(f"Input: {args.cities} cities x {len(hours):,} hours = {len(df):,} rows")
+
+timings = {}
+results = {}
+for label in ['cold (compute + store)', 'warm (cache read)']:
+    start = time.perf_counter()
+    results[label] = create_features(df)
+    timings[label] = time.perf_counter() - start
+    print(f"\n{label}:")
+    print(f"  Time: {timings[label]:.2f} s")
+
+cold, warm = results.values()
+print(f"\nCache: {feature_cache.stats}, {feature_cache.size_bytes() / 1e6:.1f} MB on disk")
+print(f"✅ Outputs identical: {cold.equals(warm)}")
+print(f"✅ Speedup: {timings['cold (compute + store)'] / timings['warm (cache read)']:.1f}x")
+
+feature_cache.clear()
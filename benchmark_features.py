@@ -0,0 +1,58 @@
+import os
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+# Measure computation, not the feature cache
+os.environ['FEATURE_CACHE_ENABLED'] = 'false'
+
+from src.data.feature_engineering import create_features
+
+parser = argparse.ArgumentParser(description="Benchmark multi-city feature engineering throughput")
+parser.add_argument('--cities', type=int, default=100, help='Number of cities')
+parser.add_argument('--days', type=int, default=365, help='Days of hourly data per city')
+parser.add_argument('--missing', type=float, default=0.02, help='Fraction of hours missing')
+args = parser.parse_args()
+
+print("Benchmarking feature engineering...")
+print("=" * 50)
+
+# Synthetic hourly data for many cities, with randomly missing hours
+rng = np.random.default_rng(42)
+hours = pd.date_range('2024-01-01', periods=args.days * 24, freq='h')
+frames = []
+for i in range(args.cities):
+    timestamps = hours[rng.random(len(hours)) >= args.missing]
+    frame = pd.DataFrame({'city': f"city_{i:03d}", 'timestamp': timestamps})
+    for col in ['pm10', 'pm2_5', 'co', 'no2', 'so2', 'ozone', 'dust',
+                'uv_index', 'temperature', 'humidity', 'wind_speed', 'aqi']:
+        frame[col] = rng.gamma(2.0, 20.0, len(timestamps)).astype('float32')
+    frames.append(frame)
+df = pd.concat(frames, ignore_index=True)
+print(f"Input: {args.cities} cities x {len(hours):,} hours = {len(df):,} rows "
+      f"({args.missing:.0%} of hours missing)")
+
+
+def per_city(df):
+    """Previous path: one create_features call per city"""
+    return pd.concat([create_features(group) for _, group in df.groupby('city', sort=False)])
+
+
+def grouped(df):
+    """Single vectorized pass over every city's hourly grid"""
+    return create_features(df)
+
+
+results = {}
+for label, run in [('per-city loop', per_city), ('grouped pass', grouped)]:
+    start = time.perf_counter()
+    results[label] = run(df)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{label}:")
+    print(f"  Time:       {elapsed:.2f} s")
+    print(f"  Throughput: {len(df) / elapsed:,.0f} rows/s")
+
+a, b = (frame.reset_index(drop=True) for frame in results.values())
+print(f"\n✅ Outputs identical: {a.equals(b)}")
@@ -0,0 +1,88 @@
+import argparse
+import subprocess
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from src.data.feature_engineering import FEATURE_DTYPES, prepare_for_training
+from src.data.schema import decode_records
+from src.utils.memory import memory_report, format_memory_report, peak_rss_mb
+
+parser = argparse.ArgumentParser(description="Benchmark peak memory of loading a training set")
+parser.add_argument('--cities', type=int, default=10, help='Number of cities')
+parser.add_argument('--years', type=int, default=3, help='Years of hourly data per city')
+parser.add_argument('--mode', choices=['baseline', 'compact', 'projected'], help=argparse.SUPPRESS)
+args = parser.parse_args()
+
+# Columns a model trained on a handful of features would ask for
+PROJECTED = ['aqi', 'pm2_5', 'pm10', 'hour', 'month', 'aqi_lag_1h', 'aqi_lag_24h', 'pm2_5_rolling_24h']
+
+
+def documents(rows, fields=None):
+    """
+    Feature documents as a Mongo cursor yields them (Python floats/ints/datetimes);
+    fields mimics a projection applied by the server.
+    """
+    rng = np.random.default_rng(42)
+    start = pd.Timestamp('2020-01-01').to_pydatetime()
+    for i in range(rows):
+        doc = {'timestamp': start + pd.Timedelta(hours=i % (args.years * 8760)),
+               'city': f"city_{i // (args.years * 8760):03d}",
+               'dominant_pollutant': 'pm2_5'}
+        values = rng.random(len(FEATURE_DTYPES)) * 100
+        for (column, dtype), value in zip(FEATURE_DTYPES.items(), values):
+            doc[column] = int(value) % 24 if dtype == 'int8' else float(value)
+        if fields is not None:
+            doc = {field: doc[field] for field in ['timestamp', 'city', *fields]}
+        yield doc
+
+
+def load(mode, rows):
+    """Load the training set the old way (list of dicts), column-decoded, or projected"""
+    if mode == 'baseline':
+        df = pd.DataFrame(list(documents(rows)))
+        features = None
+    elif mode == 'compact':
+        df = decode_records(documents(rows), FEATURE_DTYPES)
+        features = None
+    else:
+        df = decode_records(documents(rows, PROJECTED), FEATURE_DTYPES,
+                            columns=['timestamp', 'city', *PROJECTED])
+        features = PROJECTED[1:]
+    X, y = prepare_for_training(df, features=features)
+    return df, X
+
+
+rows = args.cities * args.years * 8760
+
+if args.mode:
+    # Child process: load once and report time and peak RSS
+    start = time.perf_counter()
+    df, X = load(args.mode, rows)
+    print(f"{time.perf_counter() - start:.2f}")
+    print(format_memory_report(memory_report(df)))
+    print(f"{peak_rss_mb():.0f}")
+    sys.exit(0)
+
+print("Benchmarking training-set memory...")
+print("=" * 50)
+print(f"Training set: {args.cities} cities x {args.years} years = {rows:,} rows, "
+      f"{len(FEATURE_DTYPES)} numeric columns")
+
+peaks = {}
+for mode in ['baseline', 'compact', 'projected']:
+    # Separate processes so each peak RSS is measured from a clean start
+    output = subprocess.run(
+        [sys.executable, __file__, '--cities', str(args.cities), '--years', str(args.years), '--mode', mode],
+        capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()
+    peaks[mode] = float(output[-1])
+
+    print(f"\n{mode}:")
+    print(f"  Load:     {output[-3]} s")
+    print(f"  Frame:    {output[-2]}")
+    print(f"  Peak RSS: {peaks[mode]:.0f} MB")
+
+print(f"\n✅ Peak RSS reduced {peaks['baseline'] / peaks['compact']:.1f}x "
+      f"({peaks['baseline'] / peaks['projected']:.1f}x with {len(PROJECTED)} projected columns)")
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+# US EPA breakpoint tables: (C_lo, C_hi, I_lo, I_hi) per segment.
+# Index breakpoints are continuous (0/50/100/...) to match the original
+# calculate_aqi ladder, so the PM-only AQI stays identical to historical data.
+# Values above the last C_hi extrapolate along the last segment, like before.
+BREAKPOINTS = {
+    # PM2.5, 24-hour, ug/m3
+    'pm2_5': [
+        (0.0, 12.0, 0, 50),
+        (12.1, 35.4, 50, 100),
+        (35.5, 55.4, 100, 150),
+        (55.5, 150.4, 150, 200),
+        (150.5, 250.4, 200, 300),
+        (250.5, 500.4, 300, 500),
+    ],
+    # PM10, 24-hour, ug/m3
+    'pm10': [
+        (0, 54, 0, 50),
+        (55, 154, 50, 100),
+        (155, 254, 100, 150),
+        (255, 354, 150, 200),
+        (355, 424, 200, 300),
+        (425, 604, 300, 500),
+    ],
+    # Ozone, 1-hour ppm (Open-Meteo ozone is hourly). The 1-hour table starts
+    # at 0.125 ppm; below it the 8-hour Good segment and a Moderate segment
+    # stretched up to 0.124 keep the ladder continuous and non-decreasing.
+    'ozone': [
+        (0.000, 0.054, 0, 50),
+        (0.055, 0.124, 50, 100),
+        (0.125, 0.164, 100, 150),
+        (0.165, 0.204, 150, 200),
+        (0.205, 0.404, 200, 300),
+        (0.405, 0.504, 300, 400),
+        (0.505, 0.604, 400, 500),
+    ],
+    # NO2, 1-hour ppb
+    'no2': [
+        (0, 53, 0, 50),
+        (54, 100, 50, 100),
+        (101, 360, 100, 150),
+        (361, 649, 150, 200),
+        (650, 1249, 200, 300),
+        (1250, 2049, 300, 500),
+    ],
+    # SO2, 1-hour ppb
+    'so2': [
+        (0, 35, 0, 50),
+        (36, 75, 50, 100),
+        (76, 185, 100, 150),
+        (186, 304, 150, 200),
+        (305, 604, 200, 300),
+        (605, 1004, 300, 500),
+    ],
+    # CO, 8-hour ppm
+    'co': [
+        (0.0, 4.4, 0, 50),
+        (4.5, 9.4, 50, 100),
+        (9.5, 12.4, 100, 150),
+        (12.5, 15.4, 150, 200),
+        (15.5, 30.4, 200, 300),
+        (30.5, 50.4, 300, 500),
+    ],
+}
+
+# Open-Meteo reports every pollutant in ug/m3. Gases are converted to the
+# units of their breakpoint table at 25C / 1 atm (24.45 L/mol).
+UNIT_SCALE = {
+    'pm2_5': 1.0,
+    'pm10': 1.0,
+    'ozone': 24.45 / 48.00 / 1000,    # ug/m3 -> ppm
+    'no2': 24.45 / 46.01,             # ug/m3 -> ppb
+    'so2': 24.45 / 64.07,             # ug/m3 -> ppb
+    'co': 24.45 / 28.01 / 1000,       # ug/m3 -> ppm
+}
+
+# Pollutants used for the stored `aqi` column (the model target)
+DEFAULT_POLLUTANTS = ('pm2_5', 'pm10')
+ALL_POLLUTANTS = tuple(BREAKPOINTS)
+
+# AQI categories and their (inclusive) upper bounds, as shown on the dashboard
+AQI_CATEGORIES = [
+    ('Good', 50),
+    ('Moderate', 100),
+    ('Unhealthy for Sensitive', 150),
+    ('Unhealthy', 200),
+    ('Very Unhealthy', 300),
+    ('Hazardous', np.inf),
+]
+
+_TABLES = {name: np.asarray(rows, dtype='float64').T for name, rows in BREAKPOINTS.items()}
+
+
+def compute_sub_index(pollutant, concentration):
+    """Compute the AQI sub-index for a whole column of concentrations (ug/m3)"""
+    c_lo, c_hi, i_lo, i_hi = _TABLES[pollutant]
+
+    values = np.asarray(concentration, dtype='float64') * UNIT_SCALE[pollutant]
+
+    # First segment whose upper bound is >= the value; past the end -> last segment
+    seg = np.searchsorted(c_hi, values, side='left')
+    seg = np.minimum(seg, len(c_hi) - 1)
+
+    sub_index = i_lo[seg] + (i_hi[seg] - i_lo[seg]) / (c_hi[seg] - c_lo[seg]) * (values - c_lo[seg])
+
+    # Missing readings contribute 0, as in calculate_aqi
+    return np.where(np.isnan(values), 0.0, sub_index)
+
+
+def compute_aqi(df, pollutants=DEFAULT_POLLUTANTS):
+    """
+    Vectorized AQI for every row of df.
+
+    Returns a DataFrame aligned with df holding `aqi` (max sub-index over the
+    available pollutants) and `dominant_pollutant` (the pollutant that set it,
+    None when none of them were measured).
+    """
+    pollutants = [p for p in pollutants if p in df.columns]
+
+    if not pollutants:
+        logger.warning("No pollutant columns available for AQI calculation")
+        return pd.DataFrame({'aqi': 0.0, 'dominant_pollutant': None}, index=df.index)
+
+    concentrations = [pd.to_numeric(df[p], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+                      for p in pollutants]
+    sub_indices = np.column_stack([compute_sub_index(p, c) for p, c in zip(pollutants, concentrations)])
+
+    aqi = sub_indices.max(axis=1)
+
+    dominant = np.asarray(pollutants, dtype=object)[sub_indices.argmax(axis=1)]
+    all_missing = np.column_stack([np.isnan(c) for c in concentrations]).all(axis=1)
+    dominant[all_missing] = None
+
+    return pd.DataFrame({'aqi': aqi, 'dominant_pollutant': dominant}, index=df.index)
+
+
+def aqi_category(aqi):
+    """Category label for each AQI value (None where missing)"""
+    values = np.asarray(aqi, dtype='float64')
+    labels = np.asarray([label for label, _ in AQI_CATEGORIES], dtype=object)
+    bounds = np.asarray([upper for _, upper in AQI_CATEGORIES[:-1]])
+    categories = labels[np.searchsorted(bounds, values, side='left')]
+    categories[np.isnan(values)] = None
+    return categories
@@ -0,0 +1,141 @@
+import os
+import json
+from datetime import timedelta
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from src.data.fetch_data import fetch_range
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def split_date_range(start_date, end_date, window_days=30):
+    """Split an inclusive date range into consecutive (start, end) windows"""
+    windows = []
+    window_start = start_date
+
+    while window_start <= end_date:
+        window_end = min(window_start + timedelta(days=window_days - 1), end_date)
+        windows.append((window_start, window_end))
+        window_start = window_end + timedelta(days=1)
+
+    return windows
+
+
+def _window_key(window):
+    return f"{window[0].isoformat()}/{window[1].isoformat()}"
+
+
+def load_checkpoint(path, start_date, end_date, window_days):
+    """Load completed windows, ignoring checkpoints from a different backfill"""
+    if not os.path.exists(path):
+        return set()
+
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+        return set()
+
+    if (state.get('start_date') != start_date.isoformat()
+            or state.get('end_date') != end_date.isoformat()
+            or state.get('window_days') != window_days):
+        logger.warning(f"Checkpoint {path} is for a different range, starting fresh")
+        return set()
+
+    return set(state.get('completed', []))
+
+
+def save_checkpoint(path, start_date, end_date, window_days, completed):
+    """Atomically persist the set of completed windows"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    state = {
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'window_days': window_days,
+        'completed': sorted(completed)
+    }
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def run_backfill(start_date, end_date, write_window, window_days=None, max_workers=None,
+                 lead_in_hours=24, checkpoint_path=None, reset=False, fetch_window=fetch_range):
+    """
+    Backfill [start_date, end_date] window by window.
+
+    Windows are fetched in parallel (at most max_workers at a time) and handed
+    to write_window(df, window_start, window_end) as each one arrives. Each
+    fetched frame also carries lead_in_hours of data before window_start so
+    lag/rolling features have context; those rows are for context only.
+    write_window returns True once the window is stored, which records it in
+    the checkpoint so an interrupted backfill resumes with the remaining windows.
+    fetch_window(start, end) returns the frame for a window (default: fetch_range).
+    """
+    window_days = window_days or Config.BACKFILL_WINDOW_DAYS
+    max_workers = max_workers or Config.BACKFILL_MAX_WORKERS
+    checkpoint_path = checkpoint_path or Config.BACKFILL_CHECKPOINT_PATH
+
+    windows = split_date_range(start_date, end_date, window_days)
+    completed = set() if reset else load_checkpoint(checkpoint_path, start_date, end_date, window_days)
+    pending = [w for w in windows if _window_key(w) not in completed]
+
+    logger.info(f"Backfill {start_date} to {end_date}: {len(windows)} windows of {window_days} days, "
+                f"{len(windows) - len(pending)} already done, {len(pending)} to fetch "
+                f"with {max_workers} workers")
+
+    lead_in = timedelta(days=-(-lead_in_hours // 24))
+    failed = []
+    rows = 0
+
+    # Keep at most max_workers windows in flight: the next window is only
+    # submitted once one completes, so memory stays bounded by the pool size
+    # rather than by the length of the range.
+    queue = iter(pending)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for window in islice(queue, max_workers):
+            futures[executor.submit(fetch_window, window[0] - lead_in, window[1])] = window
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                window = futures.pop(future)
+                try:
+                    df = future.result()
+                    if not write_window(df, window[0], window[1]):
+                        raise RuntimeError("write_window reported failure")
+                except Exception as e:
+                    logger.error(f"Window {_window_key(window)} failed: {e}")
+                    failed.append(window)
+                else:
+                    completed.add(_window_key(window))
+                    save_checkpoint(checkpoint_path, start_date, end_date, window_days, completed)
+                    rows += len(df)
+                    logger.info(f"Window {_window_key(window)} done ({len(completed)}/{len(windows)})")
+                # Release the frame before the next fetch starts
+                df = future = None
+
+                next_window = next(queue, None)
+                if next_window is not None:
+                    futures[executor.submit(fetch_window, next_window[0] - lead_in, next_window[1])] = next_window
+
+    if failed:
+        logger.error(f"{len(failed)} windows failed; rerun to resume from the checkpoint")
+    else:
+        logger.info(f"Backfill complete: {len(windows)} windows")
+
+    return {
+        'windows': len(windows),
+        'completed': len(completed),
+        'failed': [_window_key(w) for w in failed],
+        'rows_fetched': rows
+    }
@@ -0,0 +1,128 @@
+import os
+import json
+import hashlib
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from src.utils.disk_cache import DiskCache
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Modules whose source defines the feature values; editing any of them
+# changes the code version and so invalidates every cached frame.
+FEATURE_CODE_MODULES = ['feature_engineering.py', 'feature_registry.py', 'rolling.py', 'schema.py']
+
+
+@lru_cache(maxsize=None)
+def feature_code_version():
+    """Hash of the feature-engineering source files"""
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in FEATURE_CODE_MODULES:
+        with open(os.path.join(directory, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def frame_fingerprint(df):
+    """Content hash of a frame: column names, dtypes and every value (index ignored)"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def write_frame(f, df):
+    """
+    Write a frame to a binary file as .npz, column by column: numeric and
+    datetime columns as raw arrays, strings/categories as integer codes
+    into their distinct values.
+    """
+    arrays = {}
+    columns = []
+    for i, (name, series) in enumerate(df.items()):
+        if isinstance(series.dtype, np.dtype) and series.dtype != object:
+            arrays[f'c{i}'] = series.to_numpy()
+            columns.append([name, str(series.dtype), False])
+        else:
+            # Strings/categories: integer codes (-1 = null) plus the distinct values
+            codes, uniques = pd.factorize(series)
+            arrays[f'c{i}'] = codes.astype('int32')
+            arrays[f'u{i}'] = np.asarray(uniques, dtype=str)
+            columns.append([name, str(series.dtype), True])
+
+    keep_index = df.index.dtype.kind in 'iu'
+    if keep_index:
+        arrays['index'] = df.index.to_numpy()
+
+    meta = {'columns': columns, 'index': keep_index, 'attrs': df.attrs}
+    arrays['meta'] = np.array(json.dumps(meta, default=int))
+    np.savez(f, **arrays)
+
+
+def read_frame(source):
+    """Read a frame written by write_frame (path or binary file)"""
+    with np.load(source, allow_pickle=False) as stored:
+        meta = json.loads(stored['meta'].item())
+        data = {}
+        for i, (name, dtype, text) in enumerate(meta['columns']):
+            values = stored[f'c{i}']
+            if text:
+                # Code -1 picks the trailing None
+                uniques = np.append(stored[f'u{i}'].astype(object), None)
+                data[name] = pd.Series(uniques[values], dtype=object).astype(dtype)
+            else:
+                data[name] = values
+        index = stored['index'] if meta['index'] else None
+
+    df = pd.DataFrame(data)
+    if index is not None:
+        df.index = index
+    df.attrs.update(meta['attrs'])
+    return df
+
+
+class FeatureCache(DiskCache):
+    """
+    Content-addressed on-disk cache for feature frames.
+
+    Keys are sha256(feature code version + caller-supplied parts, e.g. the
+    fingerprint of the raw input window and the fill strategy), so a frame
+    is only reused while both the inputs and the code that produced it are
+    unchanged - there is no TTL. Frames are stored column by column in .npz
+    files (strings as integer codes into their distinct values) and evicted
+    least recently used past max_bytes, like the HTTP response cache.
+    """
+
+    suffix = '.npz'
+
+    def __init__(self, cache_dir, max_bytes=1024 * 1024 * 1024):
+        super().__init__(cache_dir, max_bytes)
+
+    def make_key(self, *parts):
+        """Content address for the current feature code and `parts`"""
+        payload = json.dumps([feature_code_version(), *parts], separators=(',', ':'), default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _write(self, f, df):
+        write_frame(f, df)
+
+    def _read(self, path):
+        return read_frame(path)
+
+    def get(self, key):
+        """Return the cached frame, or None on a miss"""
+        return self.load(key)
+
+    def put(self, key, df):
+        """Store a frame and evict LRU entries past the size cap"""
+        self.store(key, df)
+
+
+# Global instance (None when disabled)
+feature_cache = FeatureCache(
+    Config.FEATURE_CACHE_DIR,
+    max_bytes=Config.FEATURE_CACHE_MAX_BYTES
+) if Config.FEATURE_CACHE_ENABLED else None
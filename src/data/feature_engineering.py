@@ -1,17 +1,272 @@
 import pandas as pd
 import numpy as np
+from src.data.feature_registry import FeatureRegistry
+from src.data.schema import COLUMN_DTYPES, apply_dtypes
+from src.data import rolling
+from src.data.feature_cache import feature_cache, frame_fingerprint
+from src.utils.config import Config
 import logging
 
 logger = logging.getLogger(__name__)
 
-def create_features(df):
-    """Create time-based and derived features"""
-    df = df.copy()
+def hourly_grid(df):
+    """
+    Place every row on a regular hourly grid per city.
+
+    Returns (positions, groups): positions[i] is row i's slot on the grid and
+    groups[j] is the city code of grid slot j. Each city's grid runs from its
+    first to its last hour, so missing hours become empty slots instead of
+    shifting every later row.
+    """
+    if 'city' in df.columns:
+        codes, uniques = pd.factorize(df['city'], sort=False)
+        n_groups = len(uniques)
+    else:
+        codes = np.zeros(len(df), dtype=np.int64)
+        n_groups = 1 if len(df) else 0
+    
+    hours = df['timestamp'].to_numpy(dtype='datetime64[h]').astype(np.int64)
+    
+    start = np.full(n_groups, np.iinfo(np.int64).max)
+    end = np.full(n_groups, np.iinfo(np.int64).min)
+    np.minimum.at(start, codes, hours)
+    np.maximum.at(end, codes, hours)
+    
+    lengths = end - start + 1
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+    
+    positions = offsets[codes] + hours - start[codes]
+    groups = np.repeat(np.arange(n_groups), lengths)
+    return positions, groups
+
+
+def to_grid(values, positions, size):
+    """Scatter row values onto the grid (empty slots are NaN)"""
+    grid = np.full(size, np.nan)
+    grid[positions] = values
+    return grid
+
+
+def grid_shift(grid, groups, hours):
+    """Value `hours` earlier on the grid, NaN where that crosses into another city"""
+    shifted = np.full(len(grid), np.nan)
+    if hours < len(grid):
+        same_group = groups[hours:] == groups[:len(grid) - hours]
+        shifted[hours:] = np.where(same_group, grid[:len(grid) - hours], np.nan)
+    return shifted
+
+
+def rolling_mean(grid, groups, window):
+    """
+    Trailing mean over the last `window` hours of each city, ignoring NaN
+    (like rolling(min_periods=1)).
+
+    Each value is summed from its own window in a fixed order, so the result
+    for a row depends only on the rows in its window - recomputing just the
+    tail of a series gives bit-identical values to a full recompute.
+    """
+    n = len(grid)
+    valid = ~np.isnan(grid)
+    filled = np.where(valid, grid, 0.0)
+    
+    sums = np.zeros(n)
+    counts = np.zeros(n)
+    for k in range(min(window, n)):
+        same_group = groups[k:] == groups[:n - k]
+        sums[k:] += np.where(same_group, filled[:n - k], 0.0)
+        counts[k:] += valid[:n - k] & same_group
+    
+    mean = np.full(n, np.nan)
+    np.divide(sums, counts, out=mean, where=counts > 0)
+    return mean
+
+
+class FeatureContext:
+    """Shared, lazily built state for computing features over one frame"""
+    
+    def __init__(self, df):
+        self.df = df
+        self._grid = None
+        self._grids = {}
+        self._panel_index = None
+        self._kernels = {}
+    
+    @property
+    def grid(self):
+        """(positions, groups) of the hourly grid, built on first use"""
+        if self._grid is None:
+            self._grid = hourly_grid(self.df)
+        return self._grid
+    
+    def on_grid(self, col):
+        """Column values scattered onto the hourly grid"""
+        if col not in self._grids:
+            positions, groups = self.grid
+            values = self.df[col].to_numpy(dtype='float64', na_value=np.nan)
+            self._grids[col] = to_grid(values, positions, len(groups))
+        return self._grids[col]
     
-    # Sort by timestamp
-    df = df.sort_values('timestamp')
+    def lag(self, col, hours):
+        positions, groups = self.grid
+        return grid_shift(self.on_grid(col), groups, hours)[positions]
+    
+    def rolling(self, col, window):
+        positions, groups = self.grid
+        return rolling_mean(self.on_grid(col), groups, window)[positions]
+    
+    def panel_index(self):
+        """(row, column) of each grid slot in the dense (hour x city) panel"""
+        if self._panel_index is None:
+            _, groups = self.grid
+            starts = np.searchsorted(groups, np.arange(groups.max() + 1 if len(groups) else 0))
+            self._panel_index = (np.arange(len(groups)) - starts[groups], groups)
+        return self._panel_index
+    
+    def panel(self, cols):
+        """
+        Columns as one dense (hour x city*column) array: every city's series
+        starts at row 0 and shorter ones are NaN-padded, so the 2D kernels
+        in src.data.rolling run over all cities and columns in one pass.
+        """
+        rows, groups = self.panel_index()
+        n_groups = groups.max() + 1 if len(groups) else 0
+        panel = np.full((rows.max() + 1 if len(rows) else 0, n_groups * len(cols)), np.nan)
+        for i, col in enumerate(cols):
+            panel[rows, i * n_groups + groups] = self.on_grid(col)
+        return panel
+    
+    def kernel(self, name, col, *args):
+        """
+        Per-row result of a src.data.rolling kernel for col. The kernel runs
+        once over every KERNEL_COLUMNS column present and is cached, so
+        sibling features (pm2_5/pm10/aqi) share a single pass.
+        """
+        cols = [c for c in KERNEL_COLUMNS if c in self.df.columns]
+        key = (name, *args)
+        if key not in self._kernels:
+            self._kernels[key] = getattr(rolling, name)(self.panel(cols), *args)
+        
+        positions, groups = self.grid
+        rows, _ = self.panel_index()
+        n_groups = groups.max() + 1
+        column = cols.index(col) * n_groups + groups[positions]
+        return self._kernels[key][rows[positions], column]
+
+
+feature_registry = FeatureRegistry()
+
+# Time-based features
+feature_registry.register('hour', ['timestamp'], dtype='int8')(lambda ctx: ctx.df['timestamp'].dt.hour)
+feature_registry.register('day', ['timestamp'], dtype='int8')(lambda ctx: ctx.df['timestamp'].dt.day)
+feature_registry.register('month', ['timestamp'], dtype='int8')(lambda ctx: ctx.df['timestamp'].dt.month)
+feature_registry.register('day_of_week', ['timestamp'], dtype='int8')(lambda ctx: ctx.df['timestamp'].dt.dayofweek)
+feature_registry.register('is_weekend', ['day_of_week'], dtype='int8')(
+    lambda ctx: ctx.df['day_of_week'].isin([5, 6]).astype(int))
+
+# Cyclical encoding for hour and month
+feature_registry.register('hour_sin', ['hour'])(lambda ctx: np.sin(2 * np.pi * ctx.df['hour'] / 24))
+feature_registry.register('hour_cos', ['hour'])(lambda ctx: np.cos(2 * np.pi * ctx.df['hour'] / 24))
+feature_registry.register('month_sin', ['month'])(lambda ctx: np.sin(2 * np.pi * ctx.df['month'] / 12))
+feature_registry.register('month_cos', ['month'])(lambda ctx: np.cos(2 * np.pi * ctx.df['month'] / 12))
+
+# Lag features (same hour 1h / 24h earlier)
+for col in ['pm2_5', 'pm10', 'aqi', 'temperature', 'humidity']:
+    for hours in [1, 24]:
+        feature_registry.register(f'{col}_lag_{hours}h', [col], window=hours)(
+            lambda ctx, col=col, hours=hours: ctx.lag(col, hours))
+
+# Rolling averages
+for col in ['pm2_5', 'pm10', 'aqi']:
+    for hours in [3, 24]:
+        feature_registry.register(f'{col}_rolling_{hours}h', [col], window=hours - 1)(
+            lambda ctx, col=col, hours=hours: ctx.rolling(col, hours))
+
+# Longer-horizon statistics from the 2D rolling kernels. Opt-in: they are
+# computed only when requested by name (e.g. by a model's feature list), so
+# the default set - and the incremental engine's bit-identity - is unchanged.
+KERNEL_COLUMNS = ['pm2_5', 'pm10', 'aqi']
+for col in KERNEL_COLUMNS:
+    for label, hours in [('7d', 168), ('30d', 720)]:
+        feature_registry.register(f'{col}_rolling_{label}', [col], window=hours - 1, default=False)(
+            lambda ctx, col=col, hours=hours: ctx.kernel('window_mean', col, hours))
+    for stat in ['std', 'min', 'max']:
+        feature_registry.register(f'{col}_rolling_{stat}_24h', [col], window=23, default=False)(
+            lambda ctx, col=col, stat=stat: ctx.kernel(f'window_{stat}', col, 24))
+    # ~95% of an EWMA's weight lies within 3 spans
+    feature_registry.register(f'{col}_ewma_24h', [col], window=72, default=False)(
+        lambda ctx, col=col: ctx.kernel('ewma', col, rolling.span_to_alpha(24)))
+
+# Rate of change over the previous hour (0 when it is missing)
+for col in ['aqi', 'pm2_5']:
+    feature_registry.register(f'{col}_change_rate', [col, f'{col}_lag_1h'])(
+        lambda ctx, col=col: np.nan_to_num(ctx.df[col].to_numpy(dtype='float64', na_value=np.nan)
+                                           - ctx.df[f'{col}_lag_1h'].to_numpy(), nan=0.0))
+
+# Interaction features
+feature_registry.register('temp_humidity', ['temperature', 'humidity'])(
+    lambda ctx: ctx.df['temperature'] * ctx.df['humidity'])
+
+# Longest lag/rolling window; rows need this much history
+LOOKBACK_HOURS = feature_registry.lookback_hours()
+
+# Compact dtypes for raw inputs and every feature (int8 calendar fields, float32 values)
+FEATURE_DTYPES = {**COLUMN_DTYPES, **feature_registry.dtypes()}
+
+
+def create_features(df, features=None, strategy=None):
+    """
+    Create time-based and derived features.
+
+    features limits the computation to those names and their dependencies
+    (e.g. the feature list stored with a model); None computes all of them.
+    strategy picks how raw gaps are filled (see fill_missing).
+
+    Results are cached by a fingerprint of the raw input, so re-running over
+    unchanged history is a cache read.
+    """
     logger.info(f"Starting feature engineering with {len(df)} records")
     
+    key = None
+    if feature_cache is not None:
+        key = feature_cache.make_key(
+            'features', frame_fingerprint(df), sorted(features) if features is not None else None,
+            strategy or Config.FILL_STRATEGY, Config.FILL_MAX_GAP_HOURS
+        )
+        cached = feature_cache.get(key)
+        if cached is not None:
+            logger.info(f"Loaded {len(cached)} feature records from the feature cache")
+            return cached
+    
+    df = compute_features(df, features)
+    
+    logger.info("Filling missing values...")
+    df = fill_missing(df, strategy)
+    
+    if key is not None:
+        feature_cache.put(key, df)
+    
+    logger.info(f"Feature engineering complete! Created features for {len(df)} records")
+    
+    return df
+
+
+def compute_features(df, features=None):
+    """
+    Compute the requested features without filling gaps (NaN where inputs
+    are missing).
+
+    Lags and rolling windows are time-based: each city is laid out on a
+    regular hourly grid, so a missing hour leaves a gap rather than
+    misaligning later rows, and windows never cross from one city into
+    another. All cities are computed together in one pass; the grid is only
+    built if a windowed feature is requested.
+    """
+    df = df.copy()
+    
+    # Sort by city and timestamp; one row per city-hour
+    sort_cols = ['city', 'timestamp'] if 'city' in df.columns else ['timestamp']
+    df = df.drop_duplicates(sort_cols, keep='last').sort_values(sort_cols)
+    
     # Convert None to NaN for numerical operations
     numeric_cols = ['pm10', 'pm2_5', 'co', 'no2', 'so2', 'ozone', 'dust', 
                     'uv_index', 'temperature', 'humidity', 'wind_speed', 'aqi']
@@ -19,71 +274,188 @@ def create_features(df):
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors='coerce')
     
-    # Time-based features
-    df['hour'] = df['timestamp'].dt.hour
-    df['day'] = df['timestamp'].dt.day
-    df['month'] = df['timestamp'].dt.month
-    df['day_of_week'] = df['timestamp'].dt.dayofweek
-    df['is_weekend'] = df['day_of_week'].isin([5, 6]).astype(int)
+    plan = feature_registry.resolve(features)
+    logger.info(f"Computing {len(plan)} features...")
+    
+    ctx = FeatureContext(df)
+    for feature in plan:
+        missing = [col for col in feature.inputs if col not in df.columns]
+        if missing:
+            if features is not None:
+                logger.warning(f"Skipping feature {feature.name}: missing inputs {missing}")
+            continue
+        df[feature.name] = feature.compute(ctx)
+    
+    return apply_dtypes(df, FEATURE_DTYPES)
+
+
+FILL_STRATEGIES = ('ffill', 'interpolate', 'seasonal')
+
+
+def _group_starts(df):
+    """Boolean mask of the first row of each city (rows sorted by city, timestamp)"""
+    starts = np.zeros(len(df), dtype=bool)
+    if len(df):
+        starts[0] = True
+    if 'city' in df.columns:
+        codes = pd.factorize(df['city'], sort=False)[0]
+        starts[1:] |= codes[1:] != codes[:-1]
+    return starts
+
+
+def _previous_valid(valid, starts):
+    """
+    Row of the latest valid value at or before each row. City starts count
+    as "valid" so the search never crosses into the previous city - a
+    missing first value then points at itself (NaN).
+    """
+    rows = np.arange(len(valid), dtype=np.int32)[:, None]
+    previous = np.where(valid | starts[:, None], rows, 0)
+    return np.maximum.accumulate(previous, axis=0)
+
+
+def _next_valid(valid, starts):
+    """Row of the earliest valid value at or after each row, within its city"""
+    ends = np.roll(starts, -1)
+    if len(ends):
+        ends[-1] = True
+    rows = np.arange(len(valid), dtype=np.int32)[:, None]
+    following = np.where(valid | ends[:, None], rows, len(valid))[::-1]
+    return np.minimum.accumulate(following, axis=0)[::-1]
+
+
+def impute(df, columns, strategy='ffill', max_gap_hours=6, starts=None):
+    """
+    Fill missing values in `columns` as one 2D block, within each city and
+    without ever reading a later row for 'ffill' / 'seasonal':
+    
+    - ffill: carry the last observed value forward
+    - seasonal: same hour the day before if observed, else ffill
+    - interpolate: time-weighted linear interpolation across gaps of at most
+      max_gap_hours missing hours (uses the next observation), else ffill
     
-    # Cyclical encoding for hour
-    df['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24)
-    df['hour_cos'] = np.cos(2 * np.pi * df['hour'] / 24)
+    Rows are expected sorted by city and timestamp (starts: optional
+    precomputed _group_starts). Values before a city's first observation
+    stay NaN. Returns (df, counts) with the number of values imputed per
+    column.
+    """
+    if strategy not in FILL_STRATEGIES:
+        raise ValueError(f"Unknown fill strategy: {strategy} (expected one of {FILL_STRATEGIES})")
     
-    # Cyclical encoding for month
-    df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12)
-    df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12)
+    columns = [col for col in columns if col in df.columns]
+    counts = {col: 0 for col in columns}
+    gappy = [col for col in columns if df[col].isna().any()]
+    if not gappy:
+        return df, counts
     
-    logger.info("Creating lag features...")
-    # Lag features (previous hour values)
-    for col in ['pm2_5', 'pm10', 'aqi', 'temperature', 'humidity']:
-        if col in df.columns:
-            df[f'{col}_lag_1h'] = df[col].shift(1)
-            df[f'{col}_lag_24h'] = df[col].shift(24)
+    # Work in the columns' own float width (float32 features stay float32)
+    dtype = np.result_type(np.float32, *[df[col].dtype for col in gappy])
+    values = df[gappy].to_numpy(dtype=dtype, na_value=np.nan)
+    valid = ~np.isnan(values)
+    filled = values.copy()
+    if starts is None:
+        starts = _group_starts(df)
     
-    logger.info("Creating rolling averages...")
-    # Rolling averages
-    for col in ['pm2_5', 'pm10', 'aqi']:
-        if col in df.columns:
-            df[f'{col}_rolling_3h'] = df[col].rolling(window=3, min_periods=1).mean()
-            df[f'{col}_rolling_24h'] = df[col].rolling(window=24, min_periods=1).mean()
+    if strategy == 'seasonal':
+        positions, groups = hourly_grid(df)
+        grid = np.full((len(groups), len(gappy)), np.nan)
+        grid[positions] = values
+        yesterday = np.full(grid.shape, np.nan)
+        if len(groups) > 24:
+            same_group = groups[24:] == groups[:-24]
+            yesterday[24:] = np.where(same_group[:, None], grid[:-24], np.nan)
+        yesterday = yesterday[positions]
+        use = ~valid & ~np.isnan(yesterday)
+        filled[use] = yesterday[use]
     
-    logger.info("Creating rate of change features...")
-    # Rate of change (handle NaN/None values)
-    if 'aqi' in df.columns:
-        df['aqi_change_rate'] = df['aqi'].diff().fillna(0)
+    previous = _previous_valid(valid, starts)
     
-    if 'pm2_5' in df.columns:
-        df['pm2_5_change_rate'] = df['pm2_5'].diff().fillna(0)
+    if strategy == 'interpolate':
+        following = _next_valid(valid, starts)
+        hours = df['timestamp'].to_numpy(dtype='datetime64[h]').astype(np.int64)
+        rows, cols = np.nonzero(~valid)
+        p, q = previous[rows, cols], following[rows, cols]
+        q_safe = np.minimum(q, len(df) - 1)
+        span = hours[q_safe] - hours[p]
+        inside = (q < len(df)) & (span > 0) & (span - 1 <= max_gap_hours)
+        rows, cols, p, q, span = rows[inside], cols[inside], p[inside], q[inside], span[inside]
+        weight = (hours[rows] - hours[p]) / span
+        # NaN endpoints (a city's missing first/last value) leave the cell for ffill
+        interpolated = values[p, cols] + (values[q, cols] - values[p, cols]) * weight
+        filled[rows, cols] = interpolated
     
-    # Interaction features
-    if 'temperature' in df.columns and 'humidity' in df.columns:
-        df['temp_humidity'] = df['temperature'] * df['humidity']
+    rows, cols = np.nonzero(np.isnan(filled))
+    filled[rows, cols] = values[previous[rows, cols], cols]
     
-    logger.info("Filling missing values...")
-    # Fill missing values (forward then backward fill)
-    for col in df.columns:
-        if col != 'timestamp' and df[col].dtype in ['float64', 'int64']:
-            # Use bfill() and ffill() instead of deprecated fillna(method=)
-            df[col] = df[col].bfill()
-            df[col] = df[col].ffill()
-            # Fill any remaining NaN with 0
+    imputed = (~valid & ~np.isnan(filled)).sum(axis=0)
+    for j, col in enumerate(gappy):
+        counts[col] = int(imputed[j])
+        if imputed[j]:
+            df[col] = filled[:, j].astype(df[col].dtype, copy=False)
+    return df, counts
+
+
+def fill_columns(df):
+    """(raw measurement columns, derived numeric columns) present in df"""
+    raw = [col for col in COLUMN_DTYPES if col in df.columns]
+    derived = [col for col in df.columns
+               if col != 'timestamp' and col not in COLUMN_DTYPES
+               and pd.api.types.is_numeric_dtype(df[col])]
+    return raw, derived
+
+
+def fill_missing(df, strategy=None, max_gap_hours=None):
+    """
+    Fill gaps within each city without looking ahead (except for the
+    optional interpolation of raw readings): raw measurements use
+    `strategy`, derived features are forward-filled, and anything before a
+    city's first observation becomes 0. Per-column imputation counts are
+    logged and kept in df.attrs['imputed'].
+    """
+    strategy = strategy or Config.FILL_STRATEGY
+    max_gap_hours = Config.FILL_MAX_GAP_HOURS if max_gap_hours is None else max_gap_hours
+    raw, derived = fill_columns(df)
+    starts = _group_starts(df)
+    
+    df, raw_counts = impute(df, raw, strategy, max_gap_hours, starts)
+    df, derived_counts = impute(df, derived, 'ffill', starts=starts)
+    counts = {**raw_counts, **derived_counts}
+    
+    # Fill any remaining NaN (no earlier observation) with 0
+    for col in raw + derived:
+        leading = int(df[col].isna().sum()) if counts[col] or df[col].hasnans else 0
+        if leading:
             df[col] = df[col].fillna(0)
+            counts[col] += leading
     
-    logger.info(f"Feature engineering complete! Created features for {len(df)} records")
+    imputed = {col: count for col, count in counts.items() if count}
+    logger.info(f"Imputed {sum(imputed.values())} values ({strategy}): {imputed}")
+    df.attrs['imputed'] = counts
     
     return df
 
 
-def prepare_for_training(df, target_col='aqi'):
-    """Prepare data for model training"""
-    # Exclude non-feature columns
-    exclude_cols = ['timestamp', 'aqi', 'pm2_5', 'pm10', 'created_at', 'city', '_id']
-    feature_cols = [col for col in df.columns if col not in exclude_cols]
+def prepare_for_training(df, target_col='aqi', features=None):
+    """
+    Prepare data for model training.
+
+    features selects exactly those columns in that order (e.g. a model's
+    metadata['features']); missing ones are filled with 0.
+    """
+    if features is not None:
+        missing = [col for col in features if col not in df.columns]
+        if missing:
+            logger.warning(f"Features missing from data, filled with 0: {missing}")
+        X = df.reindex(columns=list(features), fill_value=0)
+    else:
+        # Exclude non-feature columns
+        exclude_cols = ['timestamp', 'aqi', 'pm2_5', 'pm10', 'created_at', 'city', '_id',
+                        'dominant_pollutant']
+        feature_cols = [col for col in df.columns if col not in exclude_cols]
+        X = df[feature_cols]
     
-    X = df[feature_cols]
     y = df[target_col] if target_col in df.columns else None
     
-    logger.info(f"Prepared {len(X)} samples with {len(feature_cols)} features for training")
+    logger.info(f"Prepared {len(X)} samples with {len(X.columns)} features for training")
     
-    return X, y
\ No newline at end of file
+    return X, y
@@ -0,0 +1,95 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Feature:
+    """
+    A named feature: the columns/features it reads, how many hours of
+    history it looks back over, its storage dtype and the function that
+    computes it. Features with default=False are only computed when asked
+    for by name.
+
+    compute(ctx) returns values aligned with ctx.df (a Series or array).
+    """
+
+    def __init__(self, name, inputs, compute, window=0, dtype='float32', default=True):
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.compute = compute
+        self.window = window
+        self.dtype = dtype
+        self.default = default
+
+    def __repr__(self):
+        return f"Feature({self.name!r}, inputs={list(self.inputs)}, window={self.window})"
+
+
+class FeatureRegistry:
+    """
+    Declarative registry of features and their dependencies.
+
+    Features are evaluated in registration order, which is also a valid
+    dependency order (a feature may only depend on raw columns or features
+    registered before it). resolve() walks the dependency graph so callers
+    can compute just the subgraph a model needs.
+    """
+
+    def __init__(self):
+        self.features = {}
+
+    def register(self, name, inputs, window=0, dtype='float32', default=True):
+        """Decorator registering compute(ctx) as feature `name`"""
+        def decorator(compute):
+            self.features[name] = Feature(name, inputs, compute, window, dtype, default)
+            return compute
+        return decorator
+
+    def names(self):
+        """All registered feature names, in evaluation order"""
+        return list(self.features)
+
+    def resolve(self, names=None):
+        """
+        Features needed to produce `names` (the default feature set if None),
+        in evaluation order. Names that are not registered are treated as raw
+        columns and skipped.
+        """
+        if names is None:
+            names = [name for name, feature in self.features.items() if feature.default]
+
+        needed = set()
+        stack = [name for name in names if name in self.features]
+        while stack:
+            name = stack.pop()
+            if name in needed:
+                continue
+            needed.add(name)
+            stack.extend(dep for dep in self.features[name].inputs if dep in self.features)
+
+        return [feature for name, feature in self.features.items() if name in needed]
+
+    def dtypes(self, names=None):
+        """Planned dtype of the requested features (every registered feature if None)"""
+        features = self.features.values() if names is None else self.resolve(names)
+        return {feature.name: feature.dtype for feature in features}
+
+    def raw_inputs(self, names=None):
+        """Raw (non-feature) columns the requested features read"""
+        inputs = []
+        for feature in self.resolve(names):
+            for dependency in feature.inputs:
+                if dependency not in self.features and dependency not in inputs:
+                    inputs.append(dependency)
+        return inputs
+
+    def lookback_hours(self, names=None):
+        """
+        Hours of history needed before a row to compute the requested
+        features (windows of chained features add up).
+        """
+        lookback = {}
+        for feature in self.resolve(names):
+            upstream = [lookback.get(dep, 0) for dep in feature.inputs]
+            lookback[feature.name] = feature.window + max(upstream, default=0)
+        return max(lookback.values(), default=0)
@@ -0,0 +1,157 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+import requests
+from requests.adapters import HTTPAdapter
+from src.data.response_cache import ResponseCache
+from src.data.rate_limiter import RequestScheduler
+from src.utils.config import Config
+from src.utils import jsonio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Archive data younger than this is still being revised upstream
+ARCHIVE_FINAL_DAYS = 14
+
+
+def archive_is_final(end_date):
+    """True if an archive range ending on end_date is finalized (safe to cache permanently)"""
+    end = date.fromisoformat(str(end_date)[:10])
+    return end <= date.today() - timedelta(days=ARCHIVE_FINAL_DAYS)
+
+
+class OpenMeteoClient:
+    """Shared keep-alive HTTP session for the Open-Meteo APIs"""
+
+    def __init__(self, pool_size=10, timeout=30, max_timings=1000, cache=None, scheduler=None):
+        self.timeout = timeout
+        self.cache = cache
+        self.scheduler = scheduler or RequestScheduler()
+        self.session = requests.Session()
+
+        # One pool per host, reused across calls and threads
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.timings = deque(maxlen=max_timings)
+        self._lock = threading.Lock()
+
+    def get_json(self, url, params, name=None, cache_permanent=False):
+        """
+        GET url and return the decoded JSON body, recording its timing.
+
+        Responses go through the response cache when one is configured;
+        cache_permanent marks finalized data that should never expire.
+        """
+        start = time.perf_counter()
+
+        if self.cache is not None:
+            data = self.cache.get(url, params)
+            if data is not None:
+                self._record(name, url, 200, 0, start, cached=True)
+                return data
+
+        # Rate limited, retried on 429/5xx by the scheduler
+        response = self.scheduler.execute(
+            url, lambda: self.session.get(url, params=params, timeout=self.timeout)
+        )
+        response.raise_for_status()
+        data = jsonio.loads(response.content)
+
+        if self.cache is not None:
+            self.cache.put(url, params, data, permanent=cache_permanent)
+
+        elapsed_ms = self._record(name, url, response.status_code, len(response.content), start)
+
+        logger.debug(f"{name or url}: {elapsed_ms:.0f} ms")
+        return data
+
+    def _record(self, name, url, status, size, start, cached=False):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.timings.append({
+                'name': name or url,
+                'url': url,
+                'status': status,
+                'bytes': size,
+                'elapsed_ms': elapsed_ms,
+                'cached': cached,
+            })
+        return elapsed_ms
+
+    def cache_stats(self):
+        """Hit/miss counters of the response cache (empty when disabled)"""
+        if self.cache is None:
+            return {}
+        return dict(self.cache.stats, size_bytes=self.cache.size_bytes())
+
+    def scheduler_stats(self):
+        """Per-endpoint request counts, retries and requests/second"""
+        return self.scheduler.stats()
+
+    def fetch_concurrently(self, tasks, max_workers=None):
+        """
+        Run independent fetch callables in parallel threads.
+
+        tasks maps a name to a zero-argument callable; returns name -> result
+        plus a timing breakdown comparing wall time with the sequential cost.
+        At most max_workers run at once (default: all of them).
+        """
+        timings = {}
+
+        def timed(name, func):
+            start = time.perf_counter()
+            result = func()
+            timings[name] = (time.perf_counter() - start) * 1000
+            return result
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers or max(len(tasks), 1)) as executor:
+            futures = {name: executor.submit(timed, name, func) for name, func in tasks.items()}
+            results = {name: future.result() for name, future in futures.items()}
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        breakdown = {
+            'requests_ms': timings,
+            'wall_ms': wall_ms,
+            'sequential_ms': sum(timings.values()),
+        }
+        breakdown['saved_ms'] = breakdown['sequential_ms'] - wall_ms
+
+        return results, breakdown
+
+    def reset_timings(self):
+        """Clear recorded request timings"""
+        with self._lock:
+            self.timings.clear()
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+
+def format_timing_breakdown(breakdown):
+    """One-line summary of a fetch_concurrently timing breakdown"""
+    per_request = ', '.join(f"{name} {ms:.0f} ms" for name, ms in breakdown['requests_ms'].items())
+    return (f"{per_request} | wall {breakdown['wall_ms']:.0f} ms vs sequential "
+            f"{breakdown['sequential_ms']:.0f} ms (saved {breakdown['saved_ms']:.0f} ms)")
+
+
+# Global instance
+http_client = OpenMeteoClient(
+    cache=ResponseCache(
+        Config.HTTP_CACHE_DIR,
+        ttl_seconds=Config.HTTP_CACHE_TTL_SECONDS,
+        max_bytes=Config.HTTP_CACHE_MAX_BYTES
+    ) if Config.HTTP_CACHE_ENABLED else None,
+    scheduler=RequestScheduler(
+        rate_per_second=Config.API_RATE_PER_SECOND,
+        burst=Config.API_BURST,
+        max_concurrency=Config.API_MAX_CONCURRENCY,
+        max_retries=Config.API_MAX_RETRIES
+    )
+)
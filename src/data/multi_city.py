@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from src.data.aqi import compute_aqi
+from src.data.http_client import http_client, format_timing_breakdown, archive_is_final
+from src.data.schema import AIR_QUALITY_VARIABLES, WEATHER_VARIABLES, UV_INDEX, COLUMN_DTYPES, apply_dtypes, decode_hourly
+from src.utils.cities import get_cities
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_BATCHES = 8
+
+
+def _batches(cities, batch_size):
+    for i in range(0, len(cities), batch_size):
+        yield cities[i:i + batch_size]
+
+
+def _batch_params(batch, start, end, variables):
+    """
+    One request's params with every coordinate in the batch packed in.
+
+    Dates request whole days; datetimes request the hour range start..end.
+    """
+    params = {
+        'latitude': ','.join(str(city['latitude']) for city in batch),
+        'longitude': ','.join(str(city['longitude']) for city in batch),
+        'hourly': list(variables),
+        'timezone': ','.join(city['timezone'] for city in batch)
+    }
+
+    if isinstance(start, datetime):
+        params['start_hour'] = start.strftime('%Y-%m-%dT%H:%M')
+        params['end_hour'] = end.strftime('%Y-%m-%dT%H:%M')
+    else:
+        params['start_date'] = start.strftime('%Y-%m-%d')
+        params['end_date'] = end.strftime('%Y-%m-%d')
+
+    return params
+
+
+def _demultiplex(data, batch, variables):
+    """Split a multi-location response into one long frame keyed by (city, timestamp)"""
+    # A single coordinate comes back as an object, several as a list in request order
+    locations = data if isinstance(data, list) else [data]
+
+    if len(locations) != len(batch):
+        raise ValueError(f"Expected {len(batch)} locations in response, got {len(locations)}")
+
+    decoded = [decode_hourly(location['hourly'], variables) for location in locations]
+    lengths = [len(columns['timestamp']) for columns in decoded]
+
+    columns = {'city': np.repeat([city['name'] for city in batch], lengths)}
+    for column in decoded[0]:
+        columns[column] = np.concatenate([location[column] for location in decoded])
+
+    return pd.DataFrame(columns)
+
+
+def fetch_cities(cities, start_date, end_date, air_quality_url, weather_url,
+                 air_quality_variables, weather_variables, cache_permanent=False, batch_size=None):
+    """
+    Fetch air quality + weather for many cities with batched requests.
+
+    Each request carries up to batch_size coordinates, so N cities cost
+    2 * ceil(N / batch_size) requests. Returns a long-format frame sorted by
+    (city, timestamp) with AQI computed.
+    """
+    batch_size = batch_size or Config.CITY_BATCH_SIZE
+    batches = list(_batches(cities, batch_size))
+
+    def fetch(url, batch, variables, name):
+        params = _batch_params(batch, start_date, end_date, variables)
+        data = http_client.get_json(url, params, name=name, cache_permanent=cache_permanent)
+        return _demultiplex(data, batch, variables)
+
+    tasks = {}
+    for i, batch in enumerate(batches):
+        tasks[f'air_quality_{i}'] = (lambda b=batch, n=f'air_quality_{i}':
+                                     fetch(air_quality_url, b, air_quality_variables, n))
+        tasks[f'weather_{i}'] = (lambda b=batch, n=f'weather_{i}':
+                                 fetch(weather_url, b, weather_variables, n))
+
+    results, breakdown = http_client.fetch_concurrently(tasks, max_workers=MAX_CONCURRENT_BATCHES)
+    logger.info(f"Fetched {len(cities)} cities in {len(tasks)} requests: "
+                f"{format_timing_breakdown(breakdown)}")
+
+    df_aqi = pd.concat([results[f'air_quality_{i}'] for i in range(len(batches))], ignore_index=True)
+    df_weather = pd.concat([results[f'weather_{i}'] for i in range(len(batches))], ignore_index=True)
+
+    df = pd.merge(df_aqi, df_weather, on=['city', 'timestamp'], how='inner')
+    df = df.sort_values(['city', 'timestamp'], ignore_index=True)
+
+    df[['aqi', 'dominant_pollutant']] = compute_aqi(df)
+    df = apply_dtypes(df, COLUMN_DTYPES)
+
+    logger.info(f"Fetched {len(df)} records for {df['city'].nunique()} cities")
+    return df
+
+
+def fetch_cities_latest(cities=None):
+    """Fetch today's data (no forecast) for every registered city"""
+    today = datetime.now().date()
+
+    return fetch_cities(
+        cities or get_cities(), today, today,
+        Config.AIR_QUALITY_API_URL, Config.FORECAST_API_URL,
+        {**AIR_QUALITY_VARIABLES, **UV_INDEX}, WEATHER_VARIABLES
+    )
+
+
+def fetch_cities_range(start_date, end_date, cities=None):
+    """Fetch archive data for a date range for every registered city"""
+    return fetch_cities(
+        cities or get_cities(), start_date, end_date,
+        Config.ARCHIVE_API_URL, Config.ARCHIVE_API_URL,
+        AIR_QUALITY_VARIABLES, {**WEATHER_VARIABLES, **UV_INDEX},
+        cache_permanent=archive_is_final(end_date)
+    )
+
+
+def current_hour(city):
+    """Start of the current hour in the city's local time (naive, like API timestamps)"""
+    return pd.Timestamp.now(tz=city['timezone']).tz_localize(None).floor('h').to_pydatetime()
+
+
+def fetch_cities_since(high_water_marks, cities=None, max_lookback_days=7):
+    """
+    Fetch only the hours after each city's high-water mark, up to its current hour.
+
+    high_water_marks maps city name -> latest stored timestamp (missing or
+    None = start of today). Cities that are already up to date are skipped;
+    gaps longer than max_lookback_days are left to the backfill.
+    """
+    cities = cities or get_cities()
+
+    starts, ends = {}, {}
+    for city in cities:
+        now = current_hour(city)
+        latest = high_water_marks.get(city['name'])
+        start = (pd.Timestamp(latest).to_pydatetime() + timedelta(hours=1)
+                 if latest is not None else now.replace(hour=0))
+
+        earliest = now - timedelta(days=max_lookback_days)
+        if start < earliest:
+            logger.warning(f"{city['name']} is more than {max_lookback_days} days behind; "
+                           f"run the backfill to fill the gap before {earliest}")
+            start = earliest
+
+        starts[city['name']] = start
+        ends[city['name']] = now
+
+    pending = [city for city in cities if starts[city['name']] <= ends[city['name']]]
+    if not pending:
+        logger.info("All cities are up to date")
+        return pd.DataFrame()
+
+    start = min(starts[city['name']] for city in pending)
+    end = max(ends[city['name']] for city in pending)
+    logger.info(f"Fetching new hours for {len(pending)} cities from {start} to {end}")
+
+    df = fetch_cities(
+        pending, start, end,
+        Config.AIR_QUALITY_API_URL, Config.FORECAST_API_URL,
+        {**AIR_QUALITY_VARIABLES, **UV_INDEX}, WEATHER_VARIABLES
+    )
+
+    # The batch spans the widest range; trim each city to its own
+    keep = ((df['timestamp'] >= df['city'].map(starts).astype('datetime64[ns]'))
+            & (df['timestamp'] <= df['city'].map(ends).astype('datetime64[ns]')))
+    return df[keep].reset_index(drop=True)
@@ -0,0 +1,200 @@
+import time
+import random
+import threading
+from urllib.parse import urlparse
+import requests
+import logging
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit driven by observed latency and errors.
+
+    Successes at a healthy latency grow the limit by roughly one slot per
+    round trip; latency above `latency_factor` x the best seen shrinks it
+    gently, and throttling/server errors halve it.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=16, latency_factor=2.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_factor = latency_factor
+        self.best_latency = None
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, latency=None, ok=True):
+        with self._cond:
+            self.in_flight -= 1
+
+            if not ok:
+                self.limit = max(self.minimum, self.limit / 2)
+            elif latency is not None:
+                if self.best_latency is None or latency < self.best_latency:
+                    self.best_latency = latency
+
+                if latency <= self.best_latency * self.latency_factor:
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                else:
+                    self.limit = max(self.minimum, self.limit * 0.9)
+
+            self._cond.notify_all()
+
+
+class RequestScheduler:
+    """
+    Per-endpoint rate limiting, adaptive concurrency and retries.
+
+    Every request is keyed by host + path; each endpoint gets its own token
+    bucket and concurrency limit. 429/5xx responses and connection errors
+    are retried with jittered exponential backoff (honouring Retry-After).
+    """
+
+    def __init__(self, rate_per_second=5.0, burst=10, max_concurrency=8,
+                 max_retries=5, backoff_base=1.0, backoff_max=60.0):
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def endpoint_key(url):
+        parsed = urlparse(url)
+        return f"{parsed.netloc}{parsed.path}"
+
+    def _endpoint(self, url):
+        key = self.endpoint_key(url)
+        with self._lock:
+            if key not in self._endpoints:
+                self._endpoints[key] = {
+                    'bucket': TokenBucket(self.rate_per_second, self.burst),
+                    'concurrency': AdaptiveConcurrency(
+                        initial=min(4, self.max_concurrency), maximum=self.max_concurrency
+                    ),
+                    'requests': 0,
+                    'retries': 0,
+                    'errors': 0,
+                    'first_start': None,
+                    'last_finish': None
+                }
+            return self._endpoints[key]
+
+    def _backoff(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass
+
+        # Full jitter: uniform in [0, base * 2^attempt]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def execute(self, url, send):
+        """
+        Run send() (which performs the HTTP request) under the endpoint's
+        limits, retrying throttled/failed attempts. Returns the final response.
+        """
+        endpoint = self._endpoint(url)
+
+        for attempt in range(self.max_retries + 1):
+            # Slot first, so no token is spent while waiting for one
+            endpoint['concurrency'].acquire()
+            start, response, error, failed = None, None, None, True
+            try:
+                endpoint['bucket'].acquire()
+
+                start = time.monotonic()
+                with self._lock:
+                    if endpoint['first_start'] is None:
+                        endpoint['first_start'] = start
+
+                try:
+                    response = send()
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    error = e
+                failed = error is not None or response.status_code in RETRY_STATUS
+            finally:
+                # Also on unexpected exceptions, which are not retried but count as failures
+                latency = time.monotonic() - start if start is not None else None
+                endpoint['concurrency'].release(latency, ok=not failed)
+
+                if start is not None:
+                    with self._lock:
+                        endpoint['requests'] += 1
+                        endpoint['last_finish'] = time.monotonic()
+                        if failed:
+                            endpoint['errors'] += 1
+
+            if not failed:
+                return response
+
+            if attempt == self.max_retries:
+                if error is not None:
+                    raise error
+                return response
+
+            delay = self._backoff(attempt, response)
+            reason = error if error is not None else f"HTTP {response.status_code}"
+            logger.warning(f"{self.endpoint_key(url)}: {reason}, retrying in {delay:.1f}s "
+                           f"(attempt {attempt + 1}/{self.max_retries})")
+            with self._lock:
+                endpoint['retries'] += 1
+            time.sleep(delay)
+
+    def stats(self):
+        """Per-endpoint request counts, current concurrency limit and requests/second"""
+        with self._lock:
+            report = {}
+            for key, endpoint in self._endpoints.items():
+                elapsed = ((endpoint['last_finish'] or 0) - (endpoint['first_start'] or 0))
+                report[key] = {
+                    'requests': endpoint['requests'],
+                    'retries': endpoint['retries'],
+                    'errors': endpoint['errors'],
+                    'concurrency_limit': round(endpoint['concurrency'].limit, 2),
+                    'requests_per_second': round(endpoint['requests'] / elapsed, 2) if elapsed > 0 else None
+                }
+            return report
@@ -0,0 +1,64 @@
+import json
+import hashlib
+import time
+from src.utils import jsonio
+from src.utils.disk_cache import DiskCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache(DiskCache):
+    """
+    Content-addressed on-disk cache for JSON API responses.
+
+    Entries are keyed by sha256(endpoint + normalized params). Permanent
+    entries (finalized archive data) never expire; the rest expire after
+    ttl_seconds. Least recently used entries are evicted past max_bytes.
+    """
+
+    suffix = '.json'
+
+    def __init__(self, cache_dir, ttl_seconds=900, max_bytes=500 * 1024 * 1024):
+        self.ttl_seconds = ttl_seconds
+        super().__init__(cache_dir, max_bytes)
+
+    @staticmethod
+    def normalize_params(params):
+        """Canonical, order-independent form of request params"""
+        normalized = {}
+        for name, value in (params or {}).items():
+            if isinstance(value, (list, tuple)):
+                value = ','.join(str(v) for v in value)
+            normalized[name] = str(value)
+        return dict(sorted(normalized.items()))
+
+    def make_key(self, url, params):
+        """Content address for an endpoint + params pair"""
+        payload = json.dumps([url, self.normalize_params(params)], separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _write(self, f, entry):
+        f.write(jsonio.dumps(entry))
+
+    def _read(self, path):
+        with open(path, 'rb') as f:
+            return jsonio.loads(f.read())
+
+    def _expired(self, entry, now):
+        return not entry['permanent'] and now - entry['created_at'] > self.ttl_seconds
+
+    def get(self, url, params):
+        """Return the cached response body, or None on a miss/expired entry"""
+        entry = self.load(self.make_key(url, params))
+        return entry['data'] if entry is not None else None
+
+    def put(self, url, params, data, permanent=False):
+        """Store a response body and evict LRU entries past the size cap"""
+        self.store(self.make_key(url, params), {
+            'url': url,
+            'params': self.normalize_params(params),
+            'created_at': time.time(),
+            'permanent': permanent,
+            'data': data
+        })
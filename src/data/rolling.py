@@ -0,0 +1,302 @@
+"""
+Rolling-window kernels on contiguous 2D arrays (time x series).
+
+Every kernel works on all series (columns) at once, ignores NaN, and
+behaves like pandas rolling(window, min_periods=1): a window that runs off
+the start of the array just uses the rows it has. Series of different
+lengths can share one array by padding with NaN.
+"""
+import operator
+import numpy as np
+from collections import deque
+
+
+def _as_2d(x):
+    x = np.asarray(x, dtype='float64')
+    return x.reshape(len(x), -1) if x.ndim == 1 else x
+
+
+class PrefixSums:
+    """
+    Cumulative sums of a 2D array (NaN as 0), valid counts and - optionally -
+    squares, each with a zero first row. Any windowed sum is then the
+    difference of two rows, so one set of prefix sums serves every window
+    length and statistic.
+
+    Each series is centred on its mean before summing, which keeps the
+    sum-of-squares cancellation in the variance small.
+    """
+
+    def __init__(self, x, squares=False):
+        x = _as_2d(x)
+        valid = ~np.isnan(x)
+        self.n, self.m = x.shape
+
+        self.centre = np.zeros(self.m)
+        has_values = valid.any(axis=0)
+        if has_values.any():
+            self.centre[has_values] = np.nanmean(x[:, has_values], axis=0)
+        centred = np.where(valid, x - self.centre, 0.0)
+
+        self.sums = np.zeros((self.n + 1, self.m))
+        self.counts = np.zeros((self.n + 1, self.m))
+        np.cumsum(centred, axis=0, out=self.sums[1:])
+        np.cumsum(valid, axis=0, out=self.counts[1:])
+
+        self.squares = None
+        if squares:
+            self.squares = np.zeros((self.n + 1, self.m))
+            np.cumsum(centred * centred, axis=0, out=self.squares[1:])
+
+    def _window(self, prefix, window):
+        """prefix[t + 1] - prefix[max(0, t + 1 - window)] for every row t"""
+        w = max(1, min(window, self.n))
+        out = np.empty((self.n, self.m))
+        out[:w] = prefix[1:w + 1]
+        np.subtract(prefix[w + 1:], prefix[1:self.n - w + 1], out=out[w:])
+        return out
+
+    def count(self, window):
+        return self._window(self.counts, window)
+
+    def sum(self, window):
+        """Windowed sum of valid values"""
+        counts = self.count(window)
+        return self._window(self.sums, window) + counts * self.centre
+
+    def mean(self, window):
+        """Windowed mean (NaN where the window has no valid values)"""
+        counts = self.count(window)
+        mean = np.full((self.n, self.m), np.nan)
+        np.divide(self._window(self.sums, window), counts, out=mean, where=counts > 0)
+        return mean + self.centre
+
+    def var(self, window, ddof=1):
+        """Windowed variance (NaN where the window has <= ddof valid values)"""
+        if self.squares is None:
+            raise ValueError("PrefixSums was built without squares")
+        counts = self.count(window)
+        sums = self._window(self.sums, window)
+        squares = self._window(self.squares, window)
+
+        var = np.full((self.n, self.m), np.nan)
+        enough = counts > ddof
+        np.divide(squares - sums * sums / np.maximum(counts, 1), counts - ddof, out=var, where=enough)
+        return np.maximum(var, 0.0, where=enough, out=var)
+
+
+def shift(x, periods):
+    """Value `periods` rows earlier (NaN before the start)"""
+    x = _as_2d(x)
+    shifted = np.full(x.shape, np.nan)
+    if periods < len(x):
+        shifted[periods:] = x[:len(x) - periods]
+    return shifted
+
+
+def window_sum(x, window):
+    """Windowed sum and count of valid values, via cumulative sums (O(n) for any window)"""
+    prefix = PrefixSums(x)
+    return prefix.sum(window), prefix.count(window)
+
+
+def window_mean(x, window):
+    """Windowed mean (NaN where the window has no valid values)"""
+    return PrefixSums(x).mean(window)
+
+
+def window_var(x, window, ddof=1):
+    """Windowed variance from cumulative sums of x and x^2"""
+    return PrefixSums(x, squares=True).var(window, ddof)
+
+
+def window_std(x, window, ddof=1):
+    """Windowed standard deviation"""
+    return np.sqrt(window_var(x, window, ddof))
+
+
+def _window_extreme(x, window, combine):
+    """
+    Windowed min/max in O(n) with van Herk/Gil-Werman blocks: prefix and
+    suffix extremes within blocks of `window` rows; each window spans at most
+    one block suffix and the next block's prefix.
+    """
+    x = _as_2d(x)
+    n, m = x.shape
+    window = max(1, min(window, n))
+
+    n_blocks = -(-n // window)
+    padded = np.full((n_blocks * window, m), np.nan)
+    padded[:n] = x
+    blocks = padded.reshape(n_blocks, window, m)
+
+    prefix = combine.accumulate(blocks, axis=1).reshape(-1, m)[:n]
+    suffix = combine.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(-1, m)[:n]
+
+    result = prefix.copy()
+    if n >= window:
+        result[window - 1:] = combine(suffix[:n - window + 1], prefix[window - 1:])
+    return result
+
+
+def window_max(x, window):
+    """Windowed maximum"""
+    return _window_extreme(x, window, np.fmax)
+
+
+def window_min(x, window):
+    """Windowed minimum"""
+    return _window_extreme(x, window, np.fmin)
+
+
+def ewma(x, alpha):
+    """
+    Exponentially weighted moving average, s_t = alpha * x_t + (1 - alpha) * s_{t-1}.
+
+    Starts at each series' first valid value; missing values carry the
+    previous average forward. One pass over time, vectorized across series.
+    """
+    x = _as_2d(x)
+    n = len(x)
+    result = np.empty(x.shape)
+    if n == 0:
+        return result
+
+    missing = np.isnan(x)
+    row_missing = missing.any(axis=1)
+    scaled = alpha * x
+
+    result[0] = x[0]
+    started = ~missing[0]
+    for t in range(1, n):
+        current = result[t]
+        np.multiply(result[t - 1], 1 - alpha, out=current)
+        current += scaled[t]
+
+        if row_missing[t] or not started.all():
+            # Carry the previous average over gaps; start series on their first value
+            np.copyto(current, result[t - 1], where=missing[t])
+            np.copyto(current, x[t], where=~started)
+            started |= ~missing[t]
+    return result
+
+
+def window_stats(x, windows, stats=('mean', 'std', 'min', 'max')):
+    """
+    Several windowed statistics for several window lengths in one pass:
+    prefix sums are built once and shared by every mean/sum/var/std.
+    Returns {(stat, window): array}.
+    """
+    prefix = PrefixSums(x, squares=any(stat in ('var', 'std') for stat in stats))
+    results = {}
+    for window in windows:
+        for stat in stats:
+            if stat == 'sum':
+                results[(stat, window)] = prefix.sum(window)
+            elif stat == 'mean':
+                results[(stat, window)] = prefix.mean(window)
+            elif stat == 'var':
+                results[(stat, window)] = prefix.var(window)
+            elif stat == 'std':
+                results[(stat, window)] = np.sqrt(prefix.var(window))
+            elif stat == 'min':
+                results[(stat, window)] = window_min(x, window)
+            elif stat == 'max':
+                results[(stat, window)] = window_max(x, window)
+            else:
+                raise ValueError(f"Unknown statistic: {stat}")
+    return results
+
+
+def span_to_alpha(span):
+    """pandas-style span -> smoothing factor"""
+    return 2.0 / (span + 1)
+
+
+class StreamingWindow:
+    """
+    O(1)-per-hour counterpart of the window kernels for `series` series.
+
+    update(row) folds in one new row and drops the row leaving the window.
+    Sum/sum-of-squares/count are kept as running totals; min/max use
+    monotonic deques (amortized O(1)). Results match the batch kernels up to
+    floating-point rounding of the running totals.
+    """
+
+    def __init__(self, window, series):
+        self.window = window
+        self.series = series
+        self.buffer = np.full((window, series), np.nan)
+        self.t = 0
+
+        self.sum = np.zeros(series)
+        self.sum_sq = np.zeros(series)
+        self.count = np.zeros(series)
+        self._max = [deque() for _ in range(series)]
+        self._min = [deque() for _ in range(series)]
+
+    def update(self, row):
+        row = np.asarray(row, dtype='float64')
+        slot = self.t % self.window
+
+        leaving = self.buffer[slot]
+        left = ~np.isnan(leaving)
+        self.sum[left] -= leaving[left]
+        self.sum_sq[left] -= leaving[left] ** 2
+        self.count[left] -= 1
+
+        entering = ~np.isnan(row)
+        self.sum[entering] += row[entering]
+        self.sum_sq[entering] += row[entering] ** 2
+        self.count[entering] += 1
+        self.buffer[slot] = row
+
+        oldest = self.t - self.window + 1
+        for i in range(self.series):
+            for dq, keep in ((self._max[i], operator.gt), (self._min[i], operator.lt)):
+                while dq and dq[0][0] < oldest:
+                    dq.popleft()
+                if entering[i]:
+                    while dq and not keep(dq[-1][1], row[i]):
+                        dq.pop()
+                    dq.append((self.t, row[i]))
+
+        self.t += 1
+        return self
+
+    def mean(self):
+        mean = np.full(self.series, np.nan)
+        np.divide(self.sum, self.count, out=mean, where=self.count > 0)
+        return mean
+
+    def var(self, ddof=1):
+        var = np.full(self.series, np.nan)
+        enough = self.count > ddof
+        var[enough] = ((self.sum_sq[enough] - self.sum[enough] ** 2 / self.count[enough])
+                       / (self.count[enough] - ddof))
+        return np.maximum(var, 0.0, where=enough, out=var)
+
+    def std(self, ddof=1):
+        return np.sqrt(self.var(ddof))
+
+    def max(self):
+        return np.array([dq[0][1] if dq else np.nan for dq in self._max])
+
+    def min(self):
+        return np.array([dq[0][1] if dq else np.nan for dq in self._min])
+
+
+class StreamingEWMA:
+    """O(1)-per-hour EWMA over `series` series; same recurrence as ewma()"""
+
+    def __init__(self, alpha, series):
+        self.alpha = alpha
+        self.state = np.full(series, np.nan)
+
+    def update(self, row):
+        row = np.asarray(row, dtype='float64')
+        valid = ~np.isnan(row)
+        started = valid & ~np.isnan(self.state)
+        self.state = np.where(started, self.alpha * row + (1 - self.alpha) * self.state,
+                              np.where(valid, row, self.state))
+        return self.state
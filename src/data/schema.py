@@ -0,0 +1,195 @@
+from itertools import islice
+from operator import itemgetter
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Open-Meteo variable -> our column name
+AIR_QUALITY_VARIABLES = {
+    'pm10': 'pm10',
+    'pm2_5': 'pm2_5',
+    'carbon_monoxide': 'co',
+    'nitrogen_dioxide': 'no2',
+    'sulphur_dioxide': 'so2',
+    'ozone': 'ozone',
+    'dust': 'dust'
+}
+
+WEATHER_VARIABLES = {
+    'temperature_2m': 'temperature',
+    'relative_humidity_2m': 'humidity',
+    'wind_speed_10m': 'wind_speed'
+}
+
+# uv_index comes from the air-quality API for current data, from weather for archive
+UV_INDEX = {'uv_index': 'uv_index'}
+
+# Measurements carry at most a couple of significant decimals, float32 is plenty
+COLUMN_DTYPES = {column: 'float32' for column in
+                 [*AIR_QUALITY_VARIABLES.values(), *WEATHER_VARIABLES.values(), *UV_INDEX.values(), 'aqi']}
+
+# Rows decoded per batch when building frames from database cursors
+RECORD_BATCH_SIZE = 10_000
+
+_HOUR = np.timedelta64(1, 'h')
+_TIME_CHECKS = 16
+
+
+def parse_hourly_timestamps(times):
+    """
+    Hourly ISO timestamps -> datetime64[ns] array.
+
+    Open-Meteo returns a regular hourly series, so only the first value is
+    parsed and the rest is generated as an int64 range. A few evenly spaced
+    samples are checked against the range; irregular series (e.g. DST
+    transitions) fall back to parsing every string.
+    """
+    n = len(times)
+    if n == 0:
+        return np.array([], dtype='datetime64[ns]')
+
+    start = np.datetime64(times[0], 'ns')
+    step = _HOUR.astype('timedelta64[ns]').astype('int64')
+    stamps = (start.astype('int64') + np.arange(n, dtype='int64') * step).view('datetime64[ns]')
+
+    checks = np.unique(np.linspace(0, n - 1, min(n, _TIME_CHECKS)).astype(int))
+    if all(np.datetime64(times[i], 'ns') == stamps[i] for i in checks):
+        return stamps
+
+    return pd.to_datetime(times).to_numpy(dtype='datetime64[ns]')
+
+
+def decode_hourly(hourly, variables):
+    """Decode an Open-Meteo `hourly` block into typed NumPy columns"""
+    columns = {'timestamp': parse_hourly_timestamps(hourly['time'])}
+
+    for variable, column in variables.items():
+        # None (missing reading) becomes NaN
+        columns[column] = np.array(hourly[variable], dtype=COLUMN_DTYPES.get(column, 'float64'))
+
+    return columns
+
+
+def can_cast(values, dtype):
+    """True if every value survives the cast to dtype (range and integrality)"""
+    dtype = np.dtype(dtype)
+    if values.dtype == dtype:
+        return True
+    if values.dtype.kind not in 'biuf':
+        return False
+
+    if dtype.kind in 'iu':
+        if values.dtype.kind == 'f' and (np.isnan(values).any() or (values != np.round(values)).any()):
+            return False
+        info = np.iinfo(dtype)
+        return len(values) == 0 or (values.min() >= info.min and values.max() <= info.max)
+
+    finite = values[np.isfinite(values)] if values.dtype.kind == 'f' else values
+    return len(finite) == 0 or np.abs(finite).max() <= np.finfo(dtype).max
+
+
+def apply_dtypes(df, dtypes):
+    """
+    Downcast columns to the planned dtypes, skipping (with a warning) any
+    column whose values would not fit. Returns the converted frame.
+    """
+    casts = {}
+    for column, dtype in dtypes.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+
+        values = df[column].to_numpy()
+        if values.dtype == object and df[column].isna().all():
+            values = values.astype('float64')
+
+        if can_cast(values, dtype):
+            casts[column] = dtype
+        else:
+            logger.warning(f"Keeping {column} as {df[column].dtype}: values do not fit {dtype}")
+
+    # One astype builds fresh blocks, so the wide original blocks are released
+    return df.astype(casts) if casts else df
+
+
+def _column_chunk(values, dtype):
+    """One batch of one column as a NumPy array, already in the planned dtype when it fits"""
+    if dtype is not None:
+        kind = np.dtype(dtype).kind
+        try:
+            if kind == 'f':
+                # None (missing field/reading) becomes NaN
+                return np.array(values, dtype=dtype)
+            if kind in 'iu':
+                chunk = np.array(values, dtype='float64')
+                return chunk.astype(dtype) if can_cast(chunk, dtype) else chunk
+        except (TypeError, ValueError):
+            pass
+    # Strings, datetimes and unplanned columns: let pandas infer
+    return pd.Series(values).to_numpy()
+
+
+def _join_chunks(chunks):
+    if len(chunks) == 1:
+        return chunks[0]
+    if len({chunk.dtype for chunk in chunks}) == 1:
+        return np.concatenate(chunks)
+    return pd.Series(np.concatenate([chunk.astype(object) for chunk in chunks])).infer_objects()
+
+
+def _transpose(batch, columns):
+    """Documents -> one tuple of values per column (None where a field is missing)"""
+    if not columns:
+        return []
+    get = itemgetter(*columns) if len(columns) > 1 else (lambda record: (record[columns[0]],))
+    try:
+        # Fast path: every document has every column
+        return list(zip(*map(get, batch)))
+    except KeyError:
+        return [tuple(record.get(column) for record in batch) for column in columns]
+
+
+def decode_records(records, dtypes, columns=None, batch_size=RECORD_BATCH_SIZE):
+    """
+    Decode an iterable of documents (e.g. a Mongo cursor) column by column.
+
+    Each batch of batch_size documents is turned into one typed NumPy array
+    per column (float columns straight into their planned dtype) and the
+    arrays are concatenated once at the end, so neither the full list of
+    dicts nor per-batch DataFrames are ever built. columns fixes the
+    columns (and their order) to read - e.g. the projection sent to Mongo;
+    by default every field seen is kept.
+    """
+    chunks = {column: [] for column in columns or []}
+    rows = 0
+    records = iter(records)
+
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            break
+
+        if columns is None:
+            for record in batch:
+                if record.keys() <= chunks.keys():
+                    continue
+                for column in record:
+                    if column not in chunks:
+                        # Column first seen in this batch: earlier rows are missing
+                        chunks[column] = [_column_chunk([None] * rows, dtypes.get(column))] if rows else []
+
+        for (column, parts), values in zip(chunks.items(), _transpose(batch, list(chunks))):
+            parts.append(_column_chunk(values, dtypes.get(column)))
+        rows += len(batch)
+
+    if not rows:
+        return pd.DataFrame(columns=columns)
+
+    # Join (and release) one column at a time; the frame takes the arrays without copying
+    joined = {}
+    for column in list(chunks):
+        joined[column] = _join_chunks(chunks.pop(column))
+    df = pd.DataFrame(joined, copy=False)
+    # Columns whose batches could not all be cast up front (e.g. all-missing ints)
+    return apply_dtypes(df, dtypes)
@@ -0,0 +1,158 @@
+"""
+Local stand-in for the Open-Meteo APIs, for exercising the fetch layer offline.
+
+Run it and point the fetchers at it:
+
+    python -m src.data.stub_server --port 8765
+    export AIR_QUALITY_API_URL=http://127.0.0.1:8765/v1/air-quality
+    export FORECAST_API_URL=http://127.0.0.1:8765/v1/forecast
+    export ARCHIVE_API_URL=http://127.0.0.1:8765/v1/archive
+
+Responses are deterministic synthetic hourly series covering the requested
+start_date..end_date (or start_hour..end_hour), so repeated runs can check
+cache hits via the server's request counter. --error-rate/--latency simulate
+throttling and slow responses for the request scheduler.
+"""
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS = {
+    '/v1/air-quality': 'AIR_QUALITY_API_URL',
+    '/v1/forecast': 'FORECAST_API_URL',
+    '/v1/archive': 'ARCHIVE_API_URL',
+}
+
+
+def synthetic_hourly(variables, start, end, offset=0, hourly_range=False):
+    """Deterministic hourly values for each requested variable"""
+    end = pd.Timestamp(end) if hourly_range else pd.Timestamp(end) + pd.Timedelta(hours=23)
+    times = pd.date_range(start, end, freq='h')
+    hours = times.hour.to_numpy()
+
+    hourly = {'time': times.strftime('%Y-%m-%dT%H:%M').tolist()}
+    for i, name in enumerate(variables):
+        base = 20.0 + 10.0 * i + offset
+        values = base + base * 0.5 * np.sin(2 * np.pi * (hours + i) / 24)
+        hourly[name] = np.round(values, 1).tolist()
+
+    return hourly
+
+
+class StubOpenMeteoServer:
+    """Threaded HTTP server answering Open-Meteo style hourly requests"""
+
+    def __init__(self, host='127.0.0.1', port=0, error_rate=0.0, error_status=429, latency=0.0):
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.latency = latency
+        self.request_count = 0
+        self.requests = []
+        self._lock = threading.Lock()
+        self._random = random.Random(42)
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = parse_qs(parsed.query)
+
+                if parsed.path not in ENDPOINTS:
+                    self.send_error(404)
+                    return
+
+                with stub._lock:
+                    stub.request_count += 1
+                    stub.requests.append((parsed.path, params))
+                    fail = stub._random.random() < stub.error_rate
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                # Simulated throttling / server errors
+                if fail:
+                    self.send_response(stub.error_status)
+                    self.send_header('Retry-After', '0')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                variables = [v for value in params.get('hourly', []) for v in value.split(',')]
+                latitudes = params.get('latitude', ['0'])[0].split(',')
+                longitudes = params.get('longitude', ['0'])[0].split(',')
+
+                if 'start_hour' in params:
+                    start, end = params['start_hour'][0], params['end_hour'][0]
+                else:
+                    start, end = params['start_date'][0], params['end_date'][0]
+
+                # Several coordinates come back as a list of per-location objects
+                locations = [{
+                    'latitude': float(lat),
+                    'longitude': float(lon),
+                    'hourly': synthetic_hourly(variables, start, end, offset=i,
+                                               hourly_range='start_hour' in params)
+                } for i, (lat, lon) in enumerate(zip(latitudes, longitudes))]
+                body = locations[0] if len(locations) == 1 else locations
+                payload = json.dumps(body).encode()
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def urls(self):
+        """Config attribute name -> stub URL for each endpoint"""
+        return {attr: f"{self.base_url}{path}" for path, attr in ENDPOINTS.items()}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with --error-status')
+    parser.add_argument('--error-status', type=int, default=429)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of delay per request')
+    args = parser.parse_args()
+
+    stub = StubOpenMeteoServer(args.host, args.port, args.error_rate, args.error_status, args.latency)
+    for attr, url in stub.urls().items():
+        print(f"export {attr}={url}")
+
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.server.server_close()
@@ -2,46 +2,179 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from src.data.fetch_data import fetch_latest_data, fetch_historical_data
+import asyncio
+import pandas as pd
+from datetime import datetime, timedelta
+from src.data.multi_city import fetch_cities_latest, fetch_cities_range, fetch_cities_since
 from src.data.feature_engineering import create_features
+from src.data.incremental_features import IncrementalFeatureEngine
+from src.data.backfill import run_backfill
+from src.data.http_client import http_client
 from src.storage.feature_store import feature_store
+from src.storage.async_store import async_feature_store
+from src.utils.cities import get_cities
+from src.utils.config import Config
+from src.utils.memory import log_memory
+from src.utils.stages import StageTimer, format_stage_timings
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def run_feature_pipeline(historical=False):
+# Raw history used to rebuild a missing/stale feature state
+STATE_BOOTSTRAP_DAYS = 7
+
+
+def save_backfill_window(df, window_start, window_end):
+    """
+    Save one backfill window (raw + features), dropping the lead-in context
+    rows. Writes bypass the write spool: the window is only checkpointed as
+    done once its rows are in MongoDB.
+    """
+    df_features = create_features(df)
+    
+    window_start = pd.Timestamp(window_start)
+    raw_saved = feature_store.save_raw_data(df[df['timestamp'] >= window_start], direct=True)
+    features_saved = feature_store.save_processed_features(
+        df_features[df_features['timestamp'] >= window_start], direct=True
+    )
+    
+    return raw_saved and features_saved
+
+
+def backfill_feature_store(start_date, end_date, **kwargs):
+    """Backfill raw data and features for all cities in resumable windows"""
+    return run_backfill(start_date, end_date, save_backfill_window,
+                        fetch_window=fetch_cities_range, **kwargs)
+
+
+def load_feature_engine(high_water_marks):
+    """
+    Restore each city's carried feature state, re-bootstrapping from stored
+    raw history any city whose state is missing or behind its raw data.
+    """
+    documents = feature_store.load_feature_states(high_water_marks.keys())
+    engine = IncrementalFeatureEngine({
+        city: IncrementalFeatureEngine.state_from_document(doc) for city, doc in documents.items()
+    })
+    
+    stale = {
+        city: pd.Timestamp(latest) - pd.Timedelta(days=STATE_BOOTSTRAP_DAYS)
+        for city, latest in high_water_marks.items()
+        if latest is not None and engine.last_timestamp(city) != pd.Timestamp(latest)
+    }
+    if stale:
+        logger.info(f"Bootstrapping feature state for {len(stale)} cities from raw history")
+        history = feature_store.get_raw_history(stale)
+        for city in stale:
+            city_history = history[history['city'] == city] if not history.empty else history
+            engine.bootstrap(city, city_history)
+    
+    return engine
+
+
+async def run_incremental_update(timer):
+    """
+    Fetch only hours newer than each city's latest stored timestamp and
+    compute features for just those hours from the carried per-city state.
+    
+    The API fetch overlaps loading the feature state, and saving the raw
+    hours overlaps computing their features.
+    """
+    cities = get_cities()
+    high_water_marks = await timer.stage(
+        'high_water_marks', async_feature_store.get_latest_timestamps([city['name'] for city in cities])
+    )
+    
+    df_new, engine = await asyncio.gather(
+        timer.thread('fetch', fetch_cities_since, high_water_marks, cities),
+        timer.thread('load_state', load_feature_engine, high_water_marks)
+    )
+    if df_new.empty:
+        logger.info("No new hours to ingest")
+        return 0
+    
+    logger.info(f"Saving {len(df_new)} new raw hours while computing their features...")
+    raw_saved, df_features = await asyncio.gather(
+        timer.stage('save_raw', async_feature_store.save_raw_data(df_new)),
+        timer.thread('features', engine.update, df_new)
+    )
+    log_memory(df_features, 'incremental features')
+    
+    logger.info(f"Saving {len(df_features)} feature rows...")
+    features_saved = await timer.stage('save_features', async_feature_store.save_processed_features(df_features))
+    
+    # Only advance the state once the rows it covers are stored
+    if raw_saved and features_saved:
+        await timer.stage('save_state', async_feature_store.save_feature_states(
+            [engine.to_document(city) for city in df_new['city'].unique()]
+        ))
+    
+    return len(df_new)
+
+
+async def run_latest_update(timer):
+    """Fetch the latest data for all cities; save it while its features are computed"""
+    logger.info("Fetching latest data...")
+    df = await timer.thread('fetch', fetch_cities_latest)
+    
+    logger.info("Saving raw data to MongoDB while creating features...")
+    _, df_features = await asyncio.gather(
+        timer.stage('save_raw', async_feature_store.save_raw_data(df)),
+        timer.thread('features', create_features, df)
+    )
+    log_memory(df_features, 'features')
+    
+    logger.info("Saving processed features to MongoDB...")
+    await timer.stage('save_features', async_feature_store.save_processed_features(df_features))
+    return len(df)
+
+
+def run_feature_pipeline(historical=False, incremental=False):
     """Run feature pipeline to fetch and process data"""
     
     try:
         logger.info("Starting feature pipeline...")
         
-        # Fetch data
-        if historical:
-            logger.info("Fetching historical data...")
-            df = fetch_historical_data(months=4)
-        else:
-            logger.info("Fetching latest data...")
-            df = fetch_latest_data()
-        
-        # Save raw data
-        logger.info("Saving raw data to MongoDB...")
-        feature_store.save_raw_data(df)
+        if incremental and not historical:
+            timer = StageTimer()
+            asyncio.run(run_incremental_update(timer))
+            logger.info(f"Stage timings: {format_stage_timings(timer.report())}")
+            logger.info(f"HTTP cache: {http_client.cache_stats()}")
+            logger.info(f"API throughput: {http_client.scheduler_stats()}")
+            logger.info("Feature pipeline completed successfully!")
+            return True
         
-        # Create features
-        logger.info("Creating features...")
-        df_features = create_features(df)
+        if historical:
+            # Archive API has 2-week delay for finalized data
+            end_date = datetime.now().date() - timedelta(days=14)
+            start_date = end_date - timedelta(days=30 * Config.HISTORICAL_MONTHS)
+            
+            logger.info("Backfilling historical data...")
+            summary = backfill_feature_store(start_date, end_date)
+            
+            logger.info(f"API throughput: {http_client.scheduler_stats()}")
+            if summary['failed']:
+                raise RuntimeError(f"Backfill windows failed: {summary['failed']}")
+            
+            logger.info("Feature pipeline completed successfully!")
+            return True
         
-        # Save processed features
-        logger.info("Saving processed features to MongoDB...")
-        feature_store.save_processed_features(df_features)
+        timer = StageTimer()
+        asyncio.run(run_latest_update(timer))
+        logger.info(f"Stage timings: {format_stage_timings(timer.report())}")
         
+        logger.info(f"HTTP cache: {http_client.cache_stats()}")
+        logger.info(f"API throughput: {http_client.scheduler_stats()}")
         logger.info("Feature pipeline completed successfully!")
         return True
         
     except Exception as e:
         logger.error(f"Feature pipeline failed: {e}")
         raise
+    finally:
+        # Spooled writes go to MongoDB in the background; give them time to land
+        feature_store.flush_writes(timeout=Config.WRITE_SPOOL_DRAIN_SECONDS)
 
 if __name__ == "__main__":
     import argparse
@@ -49,6 +182,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('--historical', action='store_true', 
                        help='Run historical data backfill')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Only fetch hours newer than the latest stored timestamp')
     args = parser.parse_args()
     
-    run_feature_pipeline(historical=args.historical)
\ No newline at end of file
+    run_feature_pipeline(historical=args.historical, incremental=args.incremental)
\ No newline at end of file
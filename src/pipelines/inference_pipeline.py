@@ -2,19 +2,23 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
+import asyncio
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from src.storage.feature_store import feature_store
-from src.storage.model_registry import model_registry
+from src.storage.async_store import async_feature_store, async_model_registry, async_aggregate_views
 from src.storage.mongodb_client import mongodb_client
-from src.data.feature_engineering import create_features, prepare_for_training
+from src.data.feature_engineering import prepare_for_training
 from src.utils.config import Config
+from src.utils.stages import StageTimer, format_stage_timings
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Hours of recent features used as prediction context
+CONTEXT_HOURS = 48
+
 def create_future_features(last_row, last_full_row, hours_ahead):
     """Create features for future predictions based on last known data"""
     
@@ -52,15 +56,67 @@ def create_future_features(last_row, last_full_row, hours_ahead):
     
     return new_row
 
+async def load_model_and_context(timer):
+    """
+    Best model, its feature list and the latest feature window. The model
+    binary downloads while the feature list and window are read.
+    """
+    model_name, version = await timer.stage('best_model', async_model_registry.get_best_model_info(metric='rmse'))
+    if model_name is None:
+        return None, None, None, pd.DataFrame()
+    
+    async def load_context():
+        # Exact feature list (and order) the model was trained on
+        model_features = await timer.stage(
+            'model_features', async_model_registry.get_model_features(model_name, version)
+        )
+        # Latest processed features of the forecast city (only the model's columns + target)
+        columns = model_features + ['aqi'] if model_features else None
+        df = await timer.stage(
+            'feature_window', async_feature_store.get_latest_features(
+                hours=CONTEXT_HOURS, cities=[Config.CITY_NAME], columns=columns
+            )
+        )
+        return model_features, df
+    
+    model, (model_features, df) = await asyncio.gather(
+        timer.stage('load_model', async_model_registry.load_model(model_name, version)),
+        load_context()
+    )
+    return model, model_name, model_features, df
+
+
+async def save_predictions(timer, predictions):
+    """Replace the stored predictions and refresh the prediction views concurrently"""
+    prediction_collection = mongodb_client.get_prediction_store()[Config.PREDICTIONS_COLLECTION]
+    pred_df = pd.DataFrame(predictions)
+    
+    def replace_predictions():
+        # Clear old predictions, insert the new ones
+        prediction_collection.delete_many({})
+        return prediction_collection.insert_many(predictions)
+    
+    result, view_stats = await asyncio.gather(
+        timer.thread('save_predictions', replace_predictions),
+        # Predicted daily stats and profiles read by the dashboard
+        timer.stage('update_views', async_aggregate_views.update('predicted', pred_df.rename(
+            columns={'predicted_aqi': 'aqi'})))
+    )
+    logger.info(f"Saved {len(result.inserted_ids)} predictions")
+    logger.info(f"Updated prediction views: {view_stats}")
+
+
 def run_inference_pipeline():
     """Run inference pipeline to generate 3-day predictions"""
     
     try:
         logger.info("Starting inference pipeline...")
         
-        # Load best model
-        logger.info("Loading best model from registry...")
-        model, model_name = model_registry.get_best_model(metric='rmse')
+        timer = StageTimer()
+        
+        # Load best model and the latest features (overlapped)
+        logger.info("Loading best model and latest features from MongoDB...")
+        model, model_name, model_features, df = asyncio.run(load_model_and_context(timer))
         
         if model is None:
             logger.error("No model available for inference!")
@@ -68,19 +124,13 @@ def run_inference_pipeline():
         
         logger.info(f"Using model: {model_name}")
         
-        # Get latest processed features
-        logger.info("Loading latest features from MongoDB...")
-        df = feature_store.get_processed_features()
-        
         if df.empty:
             logger.error("No features available for inference!")
             return False
         
-        # Sort by timestamp and get recent data
-        df = df.sort_values('timestamp')
-        
-        # Get the last 48 hours of data for context
-        recent_df = df.tail(48).copy()
+        # Sort by timestamp and keep the most recent hours as context
+        df = df.sort_values('timestamp', kind='stable')
+        recent_df = df.tail(CONTEXT_HOURS).copy()
         
         logger.info(f"Using last {len(recent_df)} records for prediction context")
         
@@ -88,7 +138,7 @@ def run_inference_pipeline():
         last_timestamp = recent_df['timestamp'].iloc[-1]
         
         # Prepare features
-        X, _ = prepare_for_training(recent_df)
+        X, _ = prepare_for_training(recent_df, features=model_features)
         
         if X.empty:
             logger.error("No valid features for inference!")
@@ -152,16 +202,8 @@ def run_inference_pipeline():
         
         # Save predictions to MongoDB
         logger.info("Saving predictions to MongoDB...")
-        prediction_db = mongodb_client.get_prediction_store()
-        prediction_collection = prediction_db[Config.PREDICTIONS_COLLECTION]
-        
-        # Clear old predictions
-        prediction_collection.delete_many({})
-        
-        # Insert new predictions
         if predictions:
-            result = prediction_collection.insert_many(predictions)
-            logger.info(f"Saved {len(result.inserted_ids)} predictions")
+            asyncio.run(save_predictions(timer, predictions))
         
         # Print summary
         pred_df = pd.DataFrame(predictions)
@@ -170,6 +212,7 @@ def run_inference_pipeline():
         logger.info(f"  AQI Range: {pred_df['predicted_aqi'].min():.1f} - {pred_df['predicted_aqi'].max():.1f}")
         logger.info(f"  Average AQI: {pred_df['predicted_aqi'].mean():.1f}")
         
+        logger.info(f"Stage timings: {format_stage_timings(timer.report())}")
         logger.info("Inference pipeline completed successfully!")
         return True
         
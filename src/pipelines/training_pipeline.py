@@ -3,9 +3,12 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.storage.feature_store import feature_store
+from src.storage.offline_store import offline_store
 from src.storage.model_registry import model_registry
 from src.data.feature_engineering import prepare_for_training
 from src.models.train import train_all_models
+from src.utils.memory import log_memory, peak_rss_mb
+from src.utils.config import Config
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -17,18 +20,32 @@ def run_training_pipeline():
     try:
         logger.info("Starting training pipeline...")
         
-        # Load training data from feature store
-        logger.info("Loading training data from MongoDB...")
-        df = feature_store.get_training_data()
+        # Load training data: a pinned or freshly exported offline snapshot, else MongoDB
+        snapshot, exported = None, False
+        if Config.OFFLINE_STORE_ENABLED:
+            snapshot = Config.TRAINING_SNAPSHOT or offline_store.export(feature_store)
+            exported = not Config.TRAINING_SNAPSHOT and snapshot is not None
         
+        if snapshot is not None:
+            logger.info(f"Loading training data from offline store snapshot v{snapshot}...")
+            df = offline_store.read(snapshot)
+        else:
+            logger.info("Loading training data from MongoDB...")
+            df = feature_store.get_training_data()
+        
+        # Daily maintenance: roll up and expire old hours (processed ones only once a snapshot has them)
+        feature_store.apply_retention(exported=exported)
+
         if df.empty:
             logger.error("No training data available!")
             return False
         
         logger.info(f"Loaded {len(df)} training samples")
+        log_memory(df, 'training data')
         
         # Prepare data
         X, y = prepare_for_training(df)
+        log_memory(X, 'training features')
         
         # Train models
         logger.info("Training models...")
@@ -61,12 +78,14 @@ def run_training_pipeline():
                     'training_samples': len(X_train),
                     'test_samples': len(X_test),
                     'features': list(X.columns),
+                    'snapshot': snapshot,
                     'is_best': (model_name == best_model_name)
                 }
             )
             
             logger.info(f"Saved {model_name} v{version} with RMSE: {metrics['rmse']:.2f}")
         
+        logger.info(f"Peak RSS: {peak_rss_mb()} MB")
         logger.info(f"Training pipeline completed! Best model: {best_model_name}")
         return True
         
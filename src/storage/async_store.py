@@ -0,0 +1,46 @@
+import asyncio
+import functools
+from src.storage.feature_store import feature_store
+from src.storage.model_registry import model_registry
+from src.storage.views import aggregate_views
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncStore:
+    """
+    Awaitable view of a synchronous store.
+
+    Every public method of the wrapped store becomes a coroutine that runs
+    the pymongo call in a worker thread (as motor does), so a pipeline can
+    have several reads and writes in flight at once with asyncio.gather
+    while the event loop stays free:
+
+        model, df = await asyncio.gather(
+            async_model_registry.load_model(name, version),
+            async_feature_store.get_latest_features(hours=48)
+        )
+
+    Attributes that are not callables are returned unchanged.
+    """
+
+    def __init__(self, store):
+        self._store = store
+
+    def __getattr__(self, name):
+        attr = getattr(self._store, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(attr, *args, **kwargs)
+
+        return call
+
+
+# Global instances
+async_feature_store = AsyncStore(feature_store)
+async_model_registry = AsyncStore(model_registry)
+async_aggregate_views = AsyncStore(aggregate_views)
@@ -0,0 +1,222 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from pymongo import ReplaceOne
+from src.data.schema import apply_dtypes, can_cast
+import logging
+
+logger = logging.getLogger(__name__)
+
+HOURS_PER_DAY = 24
+_HOUR = np.timedelta64(1, 'h')
+
+
+def hour_count(mask):
+    """Number of hours stored in a bucket (set bits of its mask)"""
+    return bin(mask).count('1')
+
+
+class DayBuckets:
+    """
+    One document per (city, day) instead of one per city-hour:
+
+        {'city': 'Karachi', 'day': 2024-01-01T00:00, 'hours': <bitmask of stored hours>,
+         'columns': [column order], 'dtypes': {column: dtype},
+         'values': {column: <24 packed values> | [24 strings]}}
+
+    Numeric and datetime columns are packed as raw little-endian arrays of
+    their dtype (24 slots, one per hour of the day); other columns are
+    lists. Field names are stored once per day rather than once per hour.
+    read() returns the same frame the hourly layout would (minus
+    created_at), oldest first.
+    """
+
+    def __init__(self, collection, dtypes):
+        self.collection = collection
+        self.dtypes = dtypes
+
+    @staticmethod
+    def day_of(timestamp):
+        return pd.Timestamp(timestamp).floor('D').to_pydatetime()
+
+    def pack(self, city, day, df):
+        """Bucket document for one city-day of rows (at most one per hour)"""
+        slots = ((df['timestamp'] - pd.Timestamp(day)) // pd.Timedelta(hours=1)).to_numpy()
+        mask = int(np.bitwise_or.reduce(np.left_shift(1, slots, dtype='int64'), initial=0))
+
+        columns = [col for col in df.columns if col not in ('timestamp', 'city', 'created_at')]
+        dtypes, values = {}, {}
+        for col in columns:
+            series = df[col]
+            if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufmM':
+                dtype = np.dtype(self.dtypes.get(col, series.dtype))
+                if dtype.kind not in 'biufmM' or not can_cast(series.to_numpy(), dtype):
+                    dtype = series.dtype
+                packed = np.zeros(HOURS_PER_DAY, dtype=dtype)
+                if dtype.kind == 'f':
+                    packed[:] = np.nan
+                packed[slots] = series.to_numpy().astype(dtype)
+                # bytes are stored as BSON binary (and read back as bytes)
+                values[col] = packed.astype(dtype.newbyteorder('<')).tobytes()
+            else:
+                dtype = np.dtype(object)
+                packed = [None] * HOURS_PER_DAY
+                for slot, value in zip(slots, series.astype(object).where(series.notna(), None)):
+                    packed[slot] = value
+                values[col] = packed
+            dtypes[col] = str(dtype)
+
+        return {
+            'city': city,
+            'day': day,
+            'hours': mask,
+            'columns': list(df.columns.drop(['created_at'], errors='ignore')),
+            'dtypes': dtypes,
+            'values': values
+        }
+
+    def unpack(self, doc):
+        """Bucket document -> {column: array} for the stored hours"""
+        slots = np.flatnonzero([(doc['hours'] >> slot) & 1 for slot in range(HOURS_PER_DAY)])
+        day = np.datetime64(doc['day'], 'us')
+        columns = {'timestamp': day + slots * _HOUR, 'city': np.full(len(slots), doc['city'], dtype=object)}
+
+        for col, dtype in doc['dtypes'].items():
+            stored = doc['values'].get(col)
+            if stored is None:
+                continue
+            if dtype == 'object':
+                columns[col] = np.array(stored, dtype=object)[slots]
+            else:
+                columns[col] = np.frombuffer(stored, dtype=np.dtype(dtype).newbyteorder('<'))[slots]
+        return columns
+
+    def to_frame(self, docs, columns=None, start_date=None, end_date=None):
+        """Unpack bucket documents into one frame sorted by timestamp"""
+        order, chunks, rows = [], {}, 0
+        for doc in docs:
+            unpacked = self.unpack(doc)
+            n = len(unpacked['timestamp'])
+            for col in doc.get('columns', unpacked):
+                if col not in chunks and col in unpacked:
+                    order.append(col)
+                    # Column first seen in this bucket: earlier rows are missing
+                    chunks[col] = [np.full(rows, np.nan)] if rows else []
+            for col, parts in chunks.items():
+                parts.append(unpacked[col] if col in unpacked else np.full(n, np.nan))
+            rows += n
+
+        if not rows:
+            return pd.DataFrame(columns=columns)
+
+        joined = {}
+        for col in order:
+            parts = chunks.pop(col)
+            if len({part.dtype for part in parts}) == 1:
+                joined[col] = np.concatenate(parts)
+            else:
+                joined[col] = pd.Series(np.concatenate([p.astype(object) for p in parts])).infer_objects()
+        df = pd.DataFrame(joined, copy=False)
+
+        if columns is not None:
+            df = df.reindex(columns=list(dict.fromkeys(['timestamp', 'city', *columns])))
+        if start_date is not None:
+            df = df[df['timestamp'] >= start_date]
+        if end_date is not None:
+            df = df[df['timestamp'] <= end_date]
+        df = df.sort_values(['timestamp', 'city'], kind='stable', ignore_index=True)
+        return apply_dtypes(df, self.dtypes)
+
+    def _projection(self, columns):
+        if columns is None:
+            return {'_id': 0}
+        fields = {'_id': 0, 'city': 1, 'day': 1, 'hours': 1, 'columns': 1}
+        for col in columns:
+            fields[f'dtypes.{col}'] = 1
+            fields[f'values.{col}'] = 1
+        return fields
+
+    def query(self, cities=None, start_date=None, end_date=None):
+        """Bucket query covering a city list and (inclusive) time range"""
+        query = {}
+        if cities is not None:
+            query['city'] = {'$in': list(cities)}
+        days = {}
+        if start_date is not None:
+            days['$gte'] = self.day_of(start_date)
+        if end_date is not None:
+            days['$lte'] = self.day_of(end_date)
+        if days:
+            query['day'] = days
+        return query
+
+    def read(self, cities=None, start_date=None, end_date=None, columns=None):
+        """Rows of the given cities within [start_date, end_date]"""
+        cursor = self.collection.find(
+            self.query(cities, start_date, end_date), projection=self._projection(columns)
+        ).sort('day', 1)
+        return self.to_frame(cursor, columns, start_date, end_date)
+
+    def latest(self, hours, city=None, columns=None):
+        """The newest `hours` rows (of one city, or overall), oldest first"""
+        query = {} if city is None else {'city': city}
+        cursor = self.collection.find(query, projection=self._projection(columns)).sort('day', -1)
+
+        docs, count = [], 0
+        for doc in cursor:
+            # Keep every bucket of the boundary day so ties across cities are complete
+            if count >= hours and doc['day'] < docs[-1]['day']:
+                break
+            docs.append(doc)
+            count += hour_count(doc['hours'])
+
+        df = self.to_frame(docs[::-1], columns)
+        return df.tail(hours).reset_index(drop=True)
+
+    def latest_timestamp(self, city):
+        """Newest stored hour of a city, or None"""
+        doc = self.collection.find_one({'city': city}, projection={'day': 1, 'hours': 1},
+                                       sort=[('day', -1)])
+        if not doc or not doc['hours']:
+            return None
+        return doc['day'] + timedelta(hours=doc['hours'].bit_length() - 1)
+
+    def write(self, df, batch_size):
+        """
+        Merge rows into their day buckets (read-modify-write per bucket) and
+        replace the changed buckets with unordered bulk writes. Returns
+        inserted/updated/unchanged bucket counts.
+        """
+        stats = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        df = df.drop_duplicates(['city', 'timestamp'], keep='last')
+        days = df['timestamp'].dt.floor('D')
+        groups = list(df.groupby([df['city'], days], sort=True))
+
+        now = datetime.now()
+        for start in range(0, len(groups), batch_size):
+            batch = groups[start:start + batch_size]
+            keys = [{'city': city, 'day': day.to_pydatetime()} for (city, day), _ in batch]
+            existing = {(doc['city'], doc['day']): doc for doc in self.collection.find({'$or': keys})}
+
+            operations = []
+            for (city, day), rows in batch:
+                day = day.to_pydatetime()
+                old = existing.get((city, day))
+                if old is not None:
+                    rows = pd.concat([self.to_frame([old]), rows], ignore_index=True)
+                    rows = rows.drop_duplicates('timestamp', keep='last').sort_values('timestamp')
+                doc = self.pack(city, day, rows)
+
+                if old is not None and all(old.get(field) == doc[field]
+                                           for field in ('hours', 'columns', 'dtypes', 'values')):
+                    stats['unchanged'] += 1
+                    continue
+                stats['updated' if old is not None else 'inserted'] += 1
+                doc['created_at'] = old.get('created_at', now) if old is not None else now
+                doc['updated_at'] = now
+                operations.append(ReplaceOne({'city': city, 'day': day}, doc, upsert=True))
+
+            if operations:
+                self.collection.bulk_write(operations, ordered=False)
+
+        return stats
@@ -1,66 +1,252 @@
 import pandas as pd
 from datetime import datetime
+from pymongo import UpdateOne
 from src.storage.mongodb_client import mongodb_client
+from src.storage.buckets import DayBuckets, hour_count
+from src.storage.rollups import RollupTiers, ROLLUP_COLUMNS, period_start
+from src.storage.views import aggregate_views
+from src.storage.write_spool import WriteSpool
+from src.data.schema import COLUMN_DTYPES, decode_records
+from src.data.feature_cache import feature_cache
+from src.data.feature_engineering import FEATURE_DTYPES
+from src.utils.cities import get_cities
 from src.utils.config import Config
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Distinct (cities, hours, columns) windows kept by get_latest_features
+LATEST_CACHE_SIZE = 16
+
+# Weeks of raw hours read at a time when rolling up history
+ROLLUP_CHUNK_WEEKS = 8
+
 class FeatureStore:
     
     def __init__(self):
         self.db = mongodb_client.get_feature_store()
         self.raw_collection = self.db[Config.RAW_DATA_COLLECTION]
         self.processed_collection = self.db[Config.PROCESSED_FEATURES_COLLECTION]
+        self.state_collection = self.db[Config.FEATURE_STATE_COLLECTION]
+        self.metadata_collection = self.db[Config.STORE_METADATA_COLLECTION]
+        
+        # Optional day-bucketed layout (one document per city-day)
+        self.bucketed = Config.FEATURE_STORE_LAYOUT == 'bucketed'
+        self.raw_buckets = DayBuckets(self.db[Config.RAW_BUCKET_COLLECTION], COLUMN_DTYPES)
+        self.processed_buckets = DayBuckets(self.db[Config.PROCESSED_BUCKET_COLLECTION], FEATURE_DTYPES)
+        
+        # Downsampled retention tiers of the raw data
+        self.rollups = RollupTiers({
+            'daily': self.db[Config.DAILY_ROLLUP_COLLECTION],
+            'weekly': self.db[Config.WEEKLY_ROLLUP_COLLECTION]
+        })
+        
+        # Local durable staging for writes, drained to MongoDB in the background
+        self.spool = WriteSpool(
+            Config.WRITE_SPOOL_PATH,
+            {'raw': self._write_raw, 'processed': self._write_processed},
+            max_bytes=Config.WRITE_SPOOL_MAX_BYTES,
+            batch_rows=Config.WRITE_SPOOL_BATCH_ROWS,
+            block_seconds=Config.WRITE_SPOOL_BLOCK_SECONDS
+        ) if Config.WRITE_SPOOL_ENABLED else None
+        self.write_stats = {}
+        self._latest_cache = {}  # (cities, hours, fields) -> (processed version, frame)
     
-    def save_raw_data(self, df):
-        """Save raw data to MongoDB"""
-        try:
-            records = df.to_dict('records')
-            
-            # Add metadata
-            for record in records:
-                record['created_at'] = datetime.now()
-                record['city'] = Config.CITY_NAME
-            
-            # Insert data
-            if records:
-                result = self.raw_collection.insert_many(records)
-                logger.info(f"Saved {len(result.inserted_ids)} raw records to MongoDB")
+    def _upsert(self, collection, df, batch_size=None):
+        """
+        Upsert one document per (city, timestamp) with unordered bulk writes.
+        
+        Re-saving an hour overwrites it instead of adding a duplicate;
+        created_at is only set when the hour is first inserted. Returns
+        inserted/updated/unchanged counts.
+        """
+        batch_size = batch_size or Config.WRITE_BATCH_SIZE
+        stats = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        
+        records = df.to_dict('records')
+        now = datetime.now()
+        for start in range(0, len(records), batch_size):
+            operations = []
+            for record in records[start:start + batch_size]:
+                record.pop('created_at', None)
+                record.setdefault('city', Config.CITY_NAME)
+                operations.append(UpdateOne(
+                    {'city': record['city'], 'timestamp': record['timestamp']},
+                    {'$set': record, '$setOnInsert': {'created_at': now}},
+                    upsert=True
+                ))
             
+            result = collection.bulk_write(operations, ordered=False)
+            stats['inserted'] += result.upserted_count
+            stats['updated'] += result.modified_count
+            stats['unchanged'] += result.matched_count - result.modified_count
+        
+        return stats
+    
+    def _save(self, collection, buckets, df):
+        """Write rows in the configured layout and record the write stats"""
+        if self.bucketed:
+            if 'city' not in df.columns:
+                df = df.assign(city=Config.CITY_NAME)
+            stats = buckets.write(df, Config.WRITE_BATCH_SIZE)
+        else:
+            stats = self._upsert(collection, df)
+        
+        if stats['inserted'] or stats['updated']:
+            self._bump_version(collection.name)
+            if collection.name == self.processed_collection.name:
+                self._latest_cache.clear()
+        self.write_stats[collection.name] = stats
+        return stats
+    
+    def _bump_version(self, name):
+        """Advance a collection's write version (invalidates cached reads of it)"""
+        self.metadata_collection.update_one(
+            {'_id': name},
+            {'$inc': {'version': 1}, '$set': {'updated_at': datetime.now()}},
+            upsert=True
+        )
+    
+    def _version(self, name):
+        doc = self.metadata_collection.find_one({'_id': name})
+        return doc['version'] if doc else 0
+    
+    def _write_raw(self, df):
+        """Upsert raw rows and refresh the rollups and views they touch (raises on failure)"""
+        stats = self._save(self.raw_collection, self.raw_buckets, df)
+        logger.info(f"Saved raw records to MongoDB: {stats}")
+        
+        if stats['inserted'] or stats['updated']:
+            rollup_stats = self._roll_up(df)
+            logger.info(f"Updated raw data rollups and views: {rollup_stats}")
+    
+    def _write_processed(self, df):
+        """Upsert processed feature rows (raises on failure)"""
+        stats = self._save(self.processed_collection, self.processed_buckets, df)
+        logger.info(f"Saved processed features to MongoDB: {stats}")
+    
+    def save_raw_data(self, df, direct=False):
+        """
+        Upsert raw data to MongoDB (one document per city-hour, or per
+        city-day when bucketed) and refresh the rollups and aggregate views
+        of the days and weeks it touched. With the write spool enabled the
+        rows are staged locally and written in the background, unless
+        `direct` (True is then only returned once the rows are in MongoDB).
+        """
+        try:
+            if self.spool is not None and not direct:
+                self.spool.append('raw', df)
+                logger.info(f"Spooled {len(df)} raw records")
+            else:
+                self._write_raw(df)
             return True
         except Exception as e:
             logger.error(f"Error saving raw data: {e}")
             return False
     
-    def save_processed_features(self, df):
-        """Save processed features to MongoDB"""
+    def save_processed_features(self, df, direct=False):
+        """
+        Upsert processed features to MongoDB (one document per city-hour, or
+        per city-day when bucketed), through the write spool if enabled and
+        not `direct`.
+        """
         try:
-            records = df.to_dict('records')
-            
-            # Add metadata
-            for record in records:
-                record['created_at'] = datetime.now()
-                record['city'] = Config.CITY_NAME
-            
-            # Insert data
-            if records:
-                result = self.processed_collection.insert_many(records)
-                logger.info(f"Saved {len(result.inserted_ids)} processed features to MongoDB")
-            
+            if self.spool is not None and not direct:
+                self.spool.append('processed', df)
+                logger.info(f"Spooled {len(df)} processed feature records")
+            else:
+                self._write_processed(df)
             return True
         except Exception as e:
             logger.error(f"Error saving processed features: {e}")
             return False
     
-    def get_latest_raw_data(self, limit=1000):
-        """Get latest raw data from MongoDB"""
+    def flush_writes(self, timeout=None):
+        """
+        Wait for spooled writes to reach MongoDB (True once the spool is
+        empty). Whatever is left after timeout stays on disk and is flushed
+        by the next run.
+        """
+        if self.spool is None:
+            return True
+        drained = self.spool.flush(timeout)
+        pending = self.spool.pending()
+        if drained:
+            logger.info(f"Write spool drained: {self.spool.stats}")
+        else:
+            logger.warning(f"Write spool not drained after {timeout}s, {pending['rows']} rows "
+                           f"({pending['entries']} entries) kept for the next run")
+        return drained
+    
+    @staticmethod
+    def _projection(columns):
+        """
+        Mongo projection and decoded column order for a column list (None =
+        every field); city and timestamp are always included.
+        """
+        if columns is None:
+            return {'_id': 0}, None
+        fields = list(dict.fromkeys(['timestamp', 'city', *columns]))
+        return {'_id': 0, **{field: 1 for field in fields}}, fields
+    
+    @staticmethod
+    def _time_query(start_date=None, end_date=None):
+        """Query on timestamp for an optional (inclusive) start and end"""
+        bounds = {}
+        if start_date is not None:
+            bounds['$gte'] = start_date
+        if end_date is not None:
+            bounds['$lte'] = end_date
+        return {'timestamp': bounds} if bounds else {}
+    
+    def _read_raw(self, city, start_date=None, end_date=None, columns=None):
+        """Raw hours of one city within [start_date, end_date] in either layout"""
+        if self.bucketed:
+            return self.raw_buckets.read([city], start_date, end_date, columns)
+        projection, fields = self._projection(columns)
+        query = {'city': city, **self._time_query(start_date, end_date)}
+        cursor = self.raw_collection.find(query, projection=projection)
+        return decode_records(cursor, COLUMN_DTYPES, columns=fields)
+    
+    def _roll_up(self, df, weeks=None):
+        """
+        Recompute the daily and weekly rollups and the actual-AQI views of
+        the periods `df` has hours in, from all stored hours of those weeks
+        (only `weeks` (city, week start) pairs if given, with every day in
+        them).
+        """
+        if 'city' not in df.columns:
+            df = df.assign(city=Config.CITY_NAME)
+        touched = None if weeks is not None else df[['city', 'timestamp']]
+        weeks = weeks if weeks is not None else self.rollups.periods(df)
+        
+        stats = {'rollups': {'written': 0, 'skipped': 0}, 'views': {'written': 0, 'skipped': 0}}
+        by_city = {}
+        for city, start in weeks:
+            by_city.setdefault(city, []).append(start)
+        
+        for city, starts in by_city.items():
+            for i in range(0, len(starts), ROLLUP_CHUNK_WEEKS):
+                chunk = starts[i:i + ROLLUP_CHUNK_WEEKS]
+                end = chunk[-1] + pd.Timedelta(days=7) - pd.Timedelta(seconds=1)
+                hours = self._read_raw(city, chunk[0], end, ROLLUP_COLUMNS)
+                if touched is None and not hours.empty:
+                    hours = hours[period_start(hours['timestamp'], 'weekly').isin(chunk)]
+                for name, result in [('rollups', self.rollups.update(hours, touched)),
+                                     ('views', aggregate_views.update('actual', hours, touched))]:
+                    for key, value in result.items():
+                        stats[name][key] += value
+        return stats
+    
+    def get_latest_raw_data(self, limit=1000, columns=None):
+        """Get latest raw data from MongoDB (only `columns` if given)"""
         try:
-            cursor = self.raw_collection.find().sort("timestamp", -1).limit(limit)
-            df = pd.DataFrame(list(cursor))
-            
-            if not df.empty and '_id' in df.columns:
-                df = df.drop('_id', axis=1)
+            if self.bucketed:
+                df = self.raw_buckets.latest(limit, columns=columns).iloc[::-1].reset_index(drop=True)
+            else:
+                projection, fields = self._projection(columns)
+                cursor = self.raw_collection.find({}, projection=projection).sort("timestamp", -1).limit(limit)
+                df = decode_records(cursor, COLUMN_DTYPES, columns=fields)
             
             logger.info(f"Retrieved {len(df)} raw records from MongoDB")
             return df
@@ -68,22 +254,129 @@ class FeatureStore:
             logger.error(f"Error retrieving raw data: {e}")
             return pd.DataFrame()
     
-    def get_processed_features(self, start_date=None, end_date=None):
-        """Get processed features from MongoDB"""
+    def get_latest_timestamps(self, cities):
+        """Latest stored raw timestamp per city (high-water marks for incremental ingest)"""
         try:
-            query = {}
+            latest = {}
+            for city in cities:
+                if self.bucketed:
+                    latest[city] = self.raw_buckets.latest_timestamp(city)
+                    continue
+                doc = self.raw_collection.find_one(
+                    {'city': city},
+                    projection={'timestamp': 1},
+                    sort=[('timestamp', -1)]
+                )
+                latest[city] = doc['timestamp'] if doc else None
             
-            if start_date and end_date:
-                query['timestamp'] = {
-                    '$gte': start_date,
-                    '$lte': end_date
-                }
+            logger.info(f"High-water marks: {latest}")
+            return latest
+        except Exception as e:
+            logger.error(f"Error retrieving latest timestamps: {e}")
+            return {}
+    
+    def get_raw_history(self, since_by_city):
+        """Get raw records newer than a per-city cutoff (feature context for new hours)"""
+        try:
+            if not since_by_city:
+                return pd.DataFrame()
             
-            cursor = self.processed_collection.find(query).sort("timestamp", 1)
-            df = pd.DataFrame(list(cursor))
+            if self.bucketed:
+                frames = []
+                for city, since in since_by_city.items():
+                    df = self.raw_buckets.read(cities=[city], start_date=since)
+                    frames.append(df[df['timestamp'] > since])
+                df = pd.concat(frames, ignore_index=True)
+            else:
+                query = {'$or': [
+                    {'city': city, 'timestamp': {'$gt': since}}
+                    for city, since in since_by_city.items()
+                ]}
+                
+                cursor = self.raw_collection.find(query, projection={'_id': 0, 'created_at': 0})
+                df = decode_records(cursor, COLUMN_DTYPES)
+            
+            logger.info(f"Retrieved {len(df)} raw history records from MongoDB")
+            return df
+        except Exception as e:
+            logger.error(f"Error retrieving raw history: {e}")
+            return pd.DataFrame()
+    
+    def load_feature_states(self, cities):
+        """Get the stored incremental feature state document for each city"""
+        try:
+            cursor = self.state_collection.find({'city': {'$in': list(cities)}}, projection={'_id': 0})
+            states = {doc['city']: doc for doc in cursor}
             
-            if not df.empty and '_id' in df.columns:
-                df = df.drop('_id', axis=1)
+            logger.info(f"Loaded feature state for {len(states)} cities")
+            return states
+        except Exception as e:
+            logger.error(f"Error loading feature states: {e}")
+            return {}
+    
+    def save_feature_states(self, documents):
+        """Replace the stored incremental feature state for each city"""
+        try:
+            for doc in documents:
+                doc['updated_at'] = datetime.now()
+                self.state_collection.replace_one({'city': doc['city']}, doc, upsert=True)
+            
+            logger.info(f"Saved feature state for {len(documents)} cities")
+            return True
+        except Exception as e:
+            logger.error(f"Error saving feature states: {e}")
+            return False
+    
+    def _fingerprint(self, collection, time_field, name=None):
+        """
+        Cheap change marker for a collection, from two index lookups: its
+        write version and last write time (the store_metadata document, by
+        _id) and its oldest time_field value, which moves when TTL expiry
+        deletes rows without a versioned write.
+        """
+        doc = self.metadata_collection.find_one({'_id': name or collection.name}) or {}
+        oldest = collection.find_one({}, projection={'_id': 0, time_field: 1}, sort=[(time_field, 1)])
+        return [doc.get('version', 0), doc.get('updated_at'), oldest and oldest.get(time_field)]
+    
+    def get_processed_features(self, start_date=None, end_date=None, columns=None, cities=None):
+        """
+        Get processed features from MongoDB.
+        
+        start_date/end_date bound the timestamp range, cities the cities
+        and columns the fields read; all are pushed down to the query. The
+        result is cached locally, keyed by the query and a fingerprint of
+        the collection (index lookups only), so repeated reads of an
+        unchanged collection skip the full transfer.
+        """
+        try:
+            query = self._time_query(start_date, end_date)
+            if cities is not None:
+                query['city'] = {'$in': list(cities)}
+            projection, fields = self._projection(columns)
+            
+            key = None
+            if feature_cache is not None:
+                if self.bucketed:
+                    fingerprint = self._fingerprint(
+                        self.processed_buckets.collection, 'day', self.processed_collection.name
+                    )
+                else:
+                    fingerprint = self._fingerprint(self.processed_collection, 'timestamp')
+                key = feature_cache.make_key('processed', self.bucketed, query, fields, fingerprint)
+                df = feature_cache.get(key)
+                if df is not None:
+                    logger.info(f"Loaded {len(df)} processed feature records from the feature cache")
+                    return df
+            
+            if self.bucketed:
+                df = self.processed_buckets.read(cities, start_date, end_date, columns)
+            else:
+                # Decoded in batches straight into the compact feature dtypes
+                cursor = self.processed_collection.find(query, projection=projection).sort("timestamp", 1)
+                df = decode_records(cursor, FEATURE_DTYPES, columns=fields)
+            
+            if key is not None and not df.empty:
+                feature_cache.put(key, df)
             
             logger.info(f"Retrieved {len(df)} processed feature records from MongoDB")
             return df
@@ -91,29 +384,239 @@ class FeatureStore:
             logger.error(f"Error retrieving processed features: {e}")
             return pd.DataFrame()
     
-    def get_training_data(self):
-        """Get all processed features for training"""
-        return self.get_processed_features()
+    def get_cities(self):
+        """Cities with processed features"""
+        collection = self.processed_buckets.collection if self.bucketed else self.processed_collection
+        return sorted(collection.distinct('city'))
+    
+    def get_month_counts(self, city):
+        """
+        Processed rows and latest timestamp per month of one city,
+        {'YYYY-MM': {'rows': n, 'max_timestamp': str}}, without reading the
+        rows themselves (None on error).
+        """
+        try:
+            months = {}
+            if self.bucketed:
+                cursor = self.processed_buckets.collection.find(
+                    {'city': city}, projection={'_id': 0, 'day': 1, 'hours': 1}
+                )
+                for doc in cursor:
+                    if not doc['hours']:
+                        continue
+                    month = months.setdefault(doc['day'].strftime('%Y-%m'), {'rows': 0, 'max_timestamp': None})
+                    month['rows'] += hour_count(doc['hours'])
+                    last = pd.Timestamp(doc['day']) + pd.Timedelta(hours=doc['hours'].bit_length() - 1)
+                    if month['max_timestamp'] is None or last > month['max_timestamp']:
+                        month['max_timestamp'] = last
+            else:
+                # Answered from the (city, timestamp) index
+                cursor = self.processed_collection.aggregate([
+                    {'$match': {'city': city}},
+                    {'$project': {'_id': 0, 'timestamp': 1}},
+                    {'$group': {
+                        '_id': {'$dateToString': {'format': '%Y-%m', 'date': '$timestamp'}},
+                        'rows': {'$sum': 1},
+                        'max_timestamp': {'$max': '$timestamp'}
+                    }}
+                ])
+                for doc in cursor:
+                    months[doc['_id']] = {'rows': doc['rows'], 'max_timestamp': pd.Timestamp(doc['max_timestamp'])}
+            
+            return {month: {'rows': counts['rows'], 'max_timestamp': str(counts['max_timestamp'])}
+                    for month, counts in months.items()}
+        except Exception as e:
+            logger.error(f"Error counting processed features for {city}: {e}")
+            return None
     
-    def delete_old_data(self, days=90):
-        """Delete data older than specified days"""
+    def get_latest_features(self, hours=48, cities=None, columns=None):
+        """
+        Online read: the latest `hours` processed rows of each city (all
+        cities if None), oldest first.
+        
+        Each city is one reverse scan of the (city, timestamp) index with a
+        limit, so the cost does not grow with history. Results are kept in
+        memory until the processed collection's write version changes.
+        """
         try:
-            cutoff_date = datetime.now() - pd.Timedelta(days=days)
+            if cities is None:
+                cities = self.get_cities()
+            projection, fields = self._projection(columns)
+            
+            key = (tuple(cities), hours, tuple(fields) if fields else None)
+            version = self._version(self.processed_collection.name)
+            cached = self._latest_cache.get(key)
+            if cached is not None and cached[0] == version:
+                logger.info(f"Using {len(cached[1])} cached latest feature records")
+                return cached[1].copy()
+            
+            frames = []
+            for city in cities:
+                if self.bucketed:
+                    df = self.processed_buckets.latest(hours, city, columns)
+                else:
+                    cursor = (self.processed_collection.find({'city': city}, projection=projection)
+                              .sort('timestamp', -1).limit(hours))
+                    df = decode_records(cursor, FEATURE_DTYPES, columns=fields).iloc[::-1]
+                if not df.empty:
+                    frames.append(df)
             
-            result_raw = self.raw_collection.delete_many({
-                'timestamp': {'$lt': cutoff_date}
-            })
+            df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=fields)
+            
+            if len(self._latest_cache) >= LATEST_CACHE_SIZE:
+                self._latest_cache.pop(next(iter(self._latest_cache)))
+            self._latest_cache[key] = (version, df)
+            
+            logger.info(f"Retrieved latest {hours} hours for {len(cities)} cities ({len(df)} records)")
+            return df.copy()
+        except Exception as e:
+            logger.error(f"Error retrieving latest features: {e}")
+            return pd.DataFrame()
+    
+    def get_rollups(self, tier='daily', start_date=None, end_date=None, cities=None, columns=None):
+        """
+        Daily or weekly rollups of the raw data (mean/min/max/p95 of each
+        pollutant and the AQI as {column}_{stat} columns). Use these instead
+        of raw hours for long ranges: they outlive the hourly retention.
+        """
+        try:
+            df = self.rollups.read(tier, cities, start_date, end_date, columns)
+            logger.info(f"Retrieved {len(df)} {tier} rollups from MongoDB")
+            return df
+        except Exception as e:
+            logger.error(f"Error retrieving {tier} rollups: {e}")
+            return pd.DataFrame()
+    
+    def get_training_data(self, columns=None):
+        """Get all processed features for training (only `columns` if given)"""
+        return self.get_processed_features(columns=columns)
+    
+    def migrate_to_buckets(self):
+        """Copy the hourly raw and processed collections into day buckets, city by city"""
+        try:
+            for collection, buckets, dtypes in [
+                (self.raw_collection, self.raw_buckets, COLUMN_DTYPES),
+                (self.processed_collection, self.processed_buckets, FEATURE_DTYPES)
+            ]:
+                for city in collection.distinct('city'):
+                    cursor = collection.find({'city': city}, projection={'_id': 0, 'created_at': 0})
+                    stats = buckets.write(decode_records(cursor, dtypes), Config.WRITE_BATCH_SIZE)
+                    logger.info(f"Migrated {collection.name} for {city} to day buckets: {stats}")
+                self._bump_version(collection.name)
+            return True
+        except Exception as e:
+            logger.error(f"Error migrating to day buckets: {e}")
+            return False
+    
+    def _rollup_watermark_id(self, city):
+        return f"{self.rollups.collections['daily'].name}:{city}"
+    
+    def _unrolled_weeks(self, city):
+        """
+        Stored weeks of a city holding hours that the daily rollups do not
+        cover, and the newest stored day. Only days from the city's rollup
+        watermark (the newest day of the previous check) onward are counted,
+        grouped by day on the server.
+        """
+        doc = self.metadata_collection.find_one({'_id': self._rollup_watermark_id(city)})
+        since = doc['rolled_through'] if doc else None
+        
+        if self.bucketed:
+            query = {'city': city, **({'day': {'$gte': since}} if since else {})}
+            docs = self.raw_buckets.collection.find(query, projection={'_id': 0, 'day': 1, 'hours': 1})
+            counts = {doc['day']: hour_count(doc['hours']) for doc in docs}
+        else:
+            match = {'city': city, **({'timestamp': {'$gte': since}} if since else {})}
+            counts = {doc['_id']: doc['hours'] for doc in self.raw_collection.aggregate([
+                {'$match': match},
+                {'$group': {'_id': {'$dateTrunc': {'date': '$timestamp', 'unit': 'day'}},
+                            'hours': {'$sum': 1}}}
+            ])}
+        if not counts:
+            return [], None
+        
+        stored = pd.Series(counts, dtype='int64')
+        stored.index = pd.DatetimeIndex(stored.index, dtype='datetime64[us]')
+        rolled = pd.Series({
+            pd.Timestamp(doc['period_start']): doc['hours']
+            for doc in self.rollups.collections['daily'].find(
+                {'city': city, 'period_start': {'$gte': stored.index.min().to_pydatetime()}},
+                projection={'period_start': 1, 'hours': 1}
+            )
+        }, dtype='int64')
+        missing = stored.index[stored > rolled.reindex(stored.index, fill_value=0)]
+        weeks = period_start(pd.Series(missing, dtype='datetime64[us]'), 'weekly')
+        return [(city, start) for start in sorted(weeks.unique())], stored.index.max().to_pydatetime()
+    
+    def _set_rollup_watermark(self, city, day):
+        """Start the next _unrolled_weeks check of a city at `day`"""
+        self.metadata_collection.update_one(
+            {'_id': self._rollup_watermark_id(city)},
+            {'$set': {'rolled_through': day, 'updated_at': datetime.now()}},
+            upsert=True
+        )
+    
+    @staticmethod
+    def _min_utc_offset_seconds():
+        """Smallest UTC offset (winter or summer) of the registered cities' local times"""
+        year = datetime.now().year
+        offsets = [
+            pd.Timestamp(f"{year}-{month}-01", tz=city['timezone']).utcoffset().total_seconds()
+            for city in get_cities() for month in (1, 7)
+        ]
+        return min(offsets) if offsets else 0
+    
+    def apply_retention(self, exported=False):
+        """
+        Retention tiers: hourly raw data for RETENTION_HOURLY_DAYS, hourly
+        processed features for RETENTION_PROCESSED_DAYS, daily rollups for
+        RETENTION_DAILY_DAYS and weekly rollups for RETENTION_WEEKLY_DAYS
+        (0 = forever). Processed features are the training source, so they
+        only get an expiry when `exported` (this run wrote them to an
+        offline store snapshot); otherwise any expiry on them is removed.
+        
+        Any stored hours not yet in the rollups (e.g. written before they
+        existed) are rolled up first, checking only the days since the
+        previous run's check; expiry itself is left to TTL indexes,
+        so Mongo removes old documents in the background instead of a
+        delete_many scan here. Stored times are naive local times, so the
+        TTLs are shifted by the cities' UTC offset.
+        """
+        try:
+            raw = self.raw_buckets.collection if self.bucketed else self.raw_collection
+            checked = {city: self._unrolled_weeks(city) for city in raw.distinct('city')}
+            weeks = [week for city_weeks, _ in checked.values() for week in city_weeks]
+            if weeks:
+                stats = self._roll_up(pd.DataFrame(columns=['city', 'timestamp']), weeks)
+                logger.info(f"Rolled up {len(weeks)} city-weeks of stored hours: {stats}")
+            # Later hours are rolled up as they are written; the newest day
+            # is counted again next time in case it was still filling up
+            for city, (_, newest) in checked.items():
+                if newest is not None:
+                    self._set_rollup_watermark(city, newest)
             
-            result_processed = self.processed_collection.delete_many({
-                'timestamp': {'$lt': cutoff_date}
-            })
+            processed_days = Config.RETENTION_PROCESSED_DAYS if exported else 0
+            if Config.RETENTION_PROCESSED_DAYS and not exported:
+                logger.warning("Processed features not exported to the offline store; keeping all of them")
             
-            logger.info(f"Deleted {result_raw.deleted_count} raw records and "
-                       f"{result_processed.deleted_count} processed records older than {days} days")
+            offset = self._min_utc_offset_seconds()
+            for collection, buckets, days in ((self.raw_collection, self.raw_buckets, Config.RETENTION_HOURLY_DAYS),
+                                              (self.processed_collection, self.processed_buckets, processed_days)):
+                mongodb_client.ensure_ttl_index(collection, 'timestamp', days, offset)
+                # Whole days only: a bucket goes once its last hour is past the cutoff
+                mongodb_client.ensure_ttl_index(buckets.collection, 'day', days and days + 1, offset)
+            mongodb_client.ensure_ttl_index(self.rollups.collections['daily'], 'period_start',
+                                            Config.RETENTION_DAILY_DAYS, offset)
+            mongodb_client.ensure_ttl_index(self.rollups.collections['weekly'], 'period_start',
+                                            Config.RETENTION_WEEKLY_DAYS, offset)
             
+            logger.info(f"Retention: {Config.RETENTION_HOURLY_DAYS or 'unlimited'} days raw, "
+                       f"{processed_days or 'unlimited'} days processed, "
+                       f"{Config.RETENTION_DAILY_DAYS or 'unlimited'} days daily, "
+                       f"{Config.RETENTION_WEEKLY_DAYS or 'unlimited'} days weekly")
             return True
         except Exception as e:
-            logger.error(f"Error deleting old data: {e}")
+            logger.error(f"Error applying retention: {e}")
             return False
 
 # Global instance
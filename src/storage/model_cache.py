@@ -0,0 +1,59 @@
+import json
+import hashlib
+import joblib
+from src.utils.disk_cache import DiskCache
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(model_binary):
+    """sha256 of a serialized model, stored with the registry document"""
+    return hashlib.sha256(model_binary).hexdigest()
+
+
+class ModelCache(DiskCache):
+    """
+    Local on-disk cache of serialized models from the registry.
+
+    Keys are sha256(model document _id + content hash); registry documents
+    are never rewritten, so an entry stays valid until it is evicted (least
+    recently used past max_bytes, like the other local caches). Entries are
+    the joblib bytes exactly as stored in MongoDB, written atomically, and
+    are loaded from the file - with mmap_mode='r' the model's numpy arrays
+    are memory-mapped instead of read into memory.
+    """
+
+    suffix = '.joblib'
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 * 1024 * 1024, mmap_mode=None):
+        super().__init__(cache_dir, max_bytes)
+        self.mmap_mode = mmap_mode
+
+    def make_key(self, model_id, model_hash=None):
+        """Cache key of one registry document"""
+        payload = json.dumps([str(model_id), model_hash], separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _write(self, f, model_binary):
+        f.write(model_binary)
+
+    def _read(self, path):
+        return joblib.load(path, mmap_mode=self.mmap_mode)
+
+    def get(self, key):
+        """Return the cached model, or None on a miss"""
+        return self.load(key)
+
+    def put(self, key, model_binary):
+        """Store a serialized model and evict LRU entries past the size cap"""
+        self.store(key, model_binary)
+
+
+# Global instance (None when disabled)
+model_cache = ModelCache(
+    Config.MODEL_CACHE_DIR,
+    max_bytes=Config.MODEL_CACHE_MAX_BYTES,
+    mmap_mode='r' if Config.MODEL_CACHE_MMAP else None
+) if Config.MODEL_CACHE_ENABLED else None
@@ -3,6 +3,7 @@ import pickle
 from datetime import datetime
 from bson.binary import Binary
 from src.storage.mongodb_client import mongodb_client
+from src.storage.model_cache import model_cache, content_hash
 from src.utils.config import Config
 import logging
 import io
@@ -22,8 +23,7 @@ class ModelRegistry:
             # Serialize model to binary
             buffer = io.BytesIO()
             joblib.dump(model, buffer)
-            buffer.seek(0)
-            model_binary = Binary(buffer.read())
+            model_binary = Binary(buffer.getvalue())
             
             # Get next version number
             latest = self.models_collection.find_one(
@@ -37,6 +37,7 @@ class ModelRegistry:
                 'model_name': model_name,
                 'version': version,
                 'model_binary': model_binary,
+                'content_hash': content_hash(model_binary),
                 'created_at': datetime.now(),
                 'city': Config.CITY_NAME,
                 'metadata': metadata or {}
@@ -65,16 +66,17 @@ class ModelRegistry:
             return None
     
     def load_model(self, model_name, version=None):
-        """Load model from MongoDB"""
+        """Load model from the local model cache, else from MongoDB"""
         try:
             query = {'model_name': model_name}
             
             if version:
                 query['version'] = version
             
-            # Get latest version if not specified
+            # Get latest version if not specified (without the binary)
             model_doc = self.models_collection.find_one(
                 query,
+                projection={'model_binary': 0},
                 sort=[('version', -1)]
             )
             
@@ -82,8 +84,37 @@ class ModelRegistry:
                 logger.error(f"Model {model_name} not found")
                 return None
             
+            # Older documents have no content_hash; their _id alone identifies them
+            cache_key = None
+            if model_cache is not None:
+                cache_key = model_cache.make_key(model_doc['_id'], model_doc.get('content_hash'))
+                model = model_cache.get(cache_key)
+                if model is not None:
+                    logger.info(f"Loaded {model_name} v{model_doc['version']} from local model cache")
+                    return model
+            
+            model_binary = self.models_collection.find_one(
+                {'_id': model_doc['_id']},
+                projection={'model_binary': 1}
+            )['model_binary']
+            
+            expected = model_doc.get('content_hash')
+            if expected and content_hash(model_binary) != expected:
+                logger.error(f"Model {model_name} v{model_doc['version']} binary does not match its content hash")
+                return None
+            
+            if cache_key is not None:
+                try:
+                    model_cache.put(cache_key, model_binary)
+                    model = model_cache.get(cache_key)
+                    if model is not None:
+                        logger.info(f"Loaded {model_name} v{model_doc['version']} from registry (cached locally)")
+                        return model
+                except OSError as e:
+                    logger.warning(f"Could not cache {model_name} v{model_doc['version']} locally: {e}")
+            
             # Deserialize model
-            buffer = io.BytesIO(model_doc['model_binary'])
+            buffer = io.BytesIO(model_binary)
             model = joblib.load(buffer)
             
             logger.info(f"Loaded {model_name} v{model_doc['version']} from registry")
@@ -93,8 +124,31 @@ class ModelRegistry:
             logger.error(f"Error loading model: {e}")
             return None
     
-    def get_best_model(self, metric='rmse'):
-        """Get the best performing model based on metric"""
+    def get_model_features(self, model_name, version=None):
+        """Feature list the model was trained on (metadata['features']), or None"""
+        try:
+            query = {'model_name': model_name}
+            
+            if version:
+                query['version'] = version
+            
+            model_doc = self.models_collection.find_one(
+                query,
+                projection={'metadata.features': 1},
+                sort=[('version', -1)]
+            )
+            
+            if not model_doc:
+                return None
+            
+            return model_doc.get('metadata', {}).get('features')
+            
+        except Exception as e:
+            logger.error(f"Error loading model features: {e}")
+            return None
+    
+    def get_best_model_info(self, metric='rmse'):
+        """Name and version of the best performing model (lowest metric), or (None, None)"""
         try:
             # Get all latest metrics
             pipeline = [
@@ -116,17 +170,23 @@ class ModelRegistry:
             best_model_name = min(results, 
                                  key=lambda x: x['latest_metrics'].get(metric, float('inf')))
             
-            model = self.load_model(best_model_name['_id'], best_model_name['version'])
-            
             logger.info(f"Best model: {best_model_name['_id']} "
                        f"with {metric}={best_model_name['latest_metrics'][metric]:.2f}")
             
-            return model, best_model_name['_id']
+            return best_model_name['_id'], best_model_name['version']
             
         except Exception as e:
             logger.error(f"Error getting best model: {e}")
             return None, None
     
+    def get_best_model(self, metric='rmse'):
+        """Get the best performing model based on metric"""
+        model_name, version = self.get_best_model_info(metric)
+        if model_name is None:
+            return None, None
+        
+        return self.load_model(model_name, version), model_name
+    
     def get_model_metrics(self, model_name):
         """Get all metrics for a model"""
         try:
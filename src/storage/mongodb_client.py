@@ -1,6 +1,6 @@
 import certifi
 from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+from pymongo.errors import ConnectionFailure, DuplicateKeyError, OperationFailure
 from src.utils.config import Config
 import logging
 
@@ -62,21 +62,104 @@ class MongoDBClient:
     
     def _create_indexes(self):
         """Create indexes on collections for better query performance"""
-        try:
-            # Feature store indexes
-            self.feature_db[Config.RAW_DATA_COLLECTION].create_index([("timestamp", -1)])
-            self.feature_db[Config.PROCESSED_FEATURES_COLLECTION].create_index([("timestamp", -1)])
-            
-            # Model registry indexes
-            self.model_db[Config.MODELS_COLLECTION].create_index([("model_name", 1), ("version", -1)])
-            self.model_db[Config.MODEL_METRICS_COLLECTION].create_index([("model_name", 1), ("created_at", -1)])
-            
-            # Prediction indexes
-            self.prediction_db[Config.PREDICTIONS_COLLECTION].create_index([("timestamp", -1)])
-            
+        feature_db, model_db, prediction_db = self.feature_db, self.model_db, self.prediction_db
+        indexes = []
+        
+        # Feature store indexes (one document per city-hour)
+        for name in [Config.RAW_DATA_COLLECTION, Config.PROCESSED_FEATURES_COLLECTION]:
+            indexes.append((feature_db[name], [("timestamp", -1)], {}))
+            indexes.append((feature_db[name], [("city", 1), ("timestamp", 1)], {'unique': True}))
+        indexes.append((feature_db[Config.FEATURE_STATE_COLLECTION], [("city", 1)], {'unique': True}))
+        for name in [Config.RAW_BUCKET_COLLECTION, Config.PROCESSED_BUCKET_COLLECTION]:
+            indexes.append((feature_db[name], [("city", 1), ("day", 1)], {'unique': True}))
+            indexes.append((feature_db[name], [("day", -1)], {}))
+        for name in [Config.DAILY_ROLLUP_COLLECTION, Config.WEEKLY_ROLLUP_COLLECTION]:
+            indexes.append((feature_db[name], [("city", 1), ("period_start", 1)], {'unique': True}))
+        indexes.append((feature_db[Config.DAILY_STATS_COLLECTION],
+                        [("source", 1), ("city", 1), ("date", 1)], {'unique': True}))
+        indexes.append((feature_db[Config.CITY_PROFILE_COLLECTION], [("source", 1), ("city", 1)], {'unique': True}))
+        
+        # Model registry indexes
+        indexes.append((model_db[Config.MODELS_COLLECTION], [("model_name", 1), ("version", -1)], {}))
+        indexes.append((model_db[Config.MODEL_METRICS_COLLECTION], [("model_name", 1), ("created_at", -1)], {}))
+        
+        # Prediction indexes
+        indexes.append((prediction_db[Config.PREDICTIONS_COLLECTION], [("timestamp", -1)], {}))
+        
+        # One failure (e.g. a key already indexed with a TTL by
+        # ensure_ttl_index) must not skip the indexes after it
+        failed = 0
+        for collection, keys, options in indexes:
+            try:
+                if options.get('unique'):
+                    self._create_unique_index(collection, keys)
+                else:
+                    collection.create_index(keys, **options)
+            except Exception as e:
+                # IndexOptionsConflict / IndexKeySpecsConflict: the key is
+                # already indexed, with other options (such as a TTL)
+                if isinstance(e, OperationFailure) and e.code in (85, 86):
+                    continue
+                failed += 1
+                logger.warning(f"⚠️ Could not create index {keys} on {collection.name}: {e}")
+        
+        if failed:
+            logger.warning(f"⚠️ {failed} of {len(indexes)} database indexes could not be created")
+        else:
             logger.info("✅ Database indexes created")
-        except Exception as e:
-            logger.warning(f"⚠️ Could not create indexes: {e}")
+    
+    def _create_unique_index(self, collection, keys):
+        """Create a unique index, first removing duplicates left by earlier plain inserts"""
+        try:
+            collection.create_index(keys, unique=True)
+        except DuplicateKeyError:
+            removed = self._remove_duplicates(collection, [field for field, _ in keys])
+            logger.warning(f"Removed {removed} duplicate documents from {collection.name}")
+            collection.create_index(keys, unique=True)
+    
+    def _remove_duplicates(self, collection, fields):
+        """Keep the most recently created document for each key; returns the number deleted"""
+        groups = collection.aggregate([
+            {'$sort': {'created_at': -1}},
+            {'$group': {'_id': {field: f'${field}' for field in fields},
+                        'ids': {'$push': '$_id'}, 'count': {'$sum': 1}}},
+            {'$match': {'count': {'$gt': 1}}}
+        ], allowDiskUse=True)
+        
+        removed = 0
+        for group in groups:
+            removed += collection.delete_many({'_id': {'$in': group['ids'][1:]}}).deleted_count
+        return removed
+    
+    def ensure_ttl_index(self, collection, field, days, utc_offset_seconds=0):
+        """
+        Expire documents `days` after their `field` date with a TTL index
+        (0 = no expiry, removing any TTL set earlier). An existing index on
+        the field is converted in place rather than rebuilt.
+        
+        Mongo reads naive datetimes as UTC; for fields holding local times
+        `utc_offset_seconds` ahead of UTC the expiry is shifted so documents
+        still go `days` after their real time.
+        """
+        if not days:
+            for name, info in list(collection.index_information().items()):
+                if [(key, int(direction)) for key, direction in info['key']] == [(field, -1)] \
+                        and 'expireAfterSeconds' in info:
+                    collection.drop_index(name)
+                    collection.create_index([(field, -1)])
+                    logger.info(f"Removed TTL expiry on {collection.name}.{field}")
+            return
+        seconds = max(0, int(days * 24 * 3600 - utc_offset_seconds))
+        try:
+            collection.create_index([(field, -1)], expireAfterSeconds=seconds)
+        except OperationFailure as e:
+            # IndexOptionsConflict / IndexKeySpecsConflict: same key, other options
+            if e.code not in (85, 86):
+                raise
+            collection.database.command(
+                'collMod', collection.name,
+                index={'keyPattern': {field: -1}, 'expireAfterSeconds': seconds}
+            )
     
     def get_feature_store(self):
         """Get feature store database"""
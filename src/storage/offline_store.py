@@ -0,0 +1,216 @@
+import os
+import re
+import json
+from datetime import datetime
+import pandas as pd
+import pyarrow.parquet as pq
+from src.data.schema import apply_dtypes
+from src.data.feature_engineering import FEATURE_DTYPES
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class OfflineStore:
+    """
+    Parquet offline store for processed features, next to the Mongo online store.
+
+    Rows live in immutable files partitioned by city and month:
+
+        {root}/features/city={city}/month={YYYY-MM}/v{version}.parquet
+
+    Each export only writes partitions that changed and then a snapshot
+    manifest ({root}/snapshots/v{version}.json) mapping every partition to
+    its current file. Snapshots are never modified, so a training run can
+    pin one and read exactly the same data again later.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.snapshot_dir = os.path.join(root, 'snapshots')
+
+    def versions(self):
+        """Snapshot versions on disk, oldest first"""
+        if not os.path.isdir(self.snapshot_dir):
+            return []
+        matches = (re.fullmatch(r'v(\d+)\.json', name) for name in os.listdir(self.snapshot_dir))
+        return sorted(int(match.group(1)) for match in matches if match)
+
+    def load_snapshot(self, version=None):
+        """Manifest of a snapshot (the latest if None), or None if there is none"""
+        if version is None:
+            versions = self.versions()
+            if not versions:
+                return None
+            version = versions[-1]
+
+        try:
+            with open(os.path.join(self.snapshot_dir, f"v{version}.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            logger.error(f"Offline store snapshot v{version} not found")
+            return None
+
+    def _partition_path(self, city, month, version):
+        city_dir = re.sub(r'[^\w.-]', '_', city)
+        return os.path.join('features', f"city={city_dir}", f"month={month}", f"v{version}.parquet")
+
+    @staticmethod
+    def _resume_month(partitions, city):
+        """Start of the city's newest exported month (rows from there on are re-checked)"""
+        months = [partition['month'] for partition in partitions.values() if partition['city'] == city]
+        return pd.Timestamp(f"{max(months)}-01") if months else None
+
+    @staticmethod
+    def _stale_months(partitions, city, counts):
+        """
+        Months of a city with rows the snapshot lacks: new months, more rows
+        or a later last hour than exported. Months that only lost rows
+        (expired from Mongo) keep their exported history.
+        """
+        stale = []
+        for month, current in sorted(counts.items()):
+            exported = partitions.get(f"{city}/{month}")
+            if exported is None or current['rows'] > exported['rows'] \
+                    or pd.Timestamp(current['max_timestamp']) > pd.Timestamp(exported['max_timestamp']):
+                stale.append(month)
+        return stale
+
+    def _changed_rows(self, store, city, partitions):
+        """Processed rows of the city's stale months (all rows for a city not exported yet)"""
+        counts = store.get_month_counts(city)
+        if counts is None:
+            # Month counts unavailable: re-check from the newest exported month on
+            return store.get_processed_features(start_date=self._resume_month(partitions, city), cities=[city])
+
+        frames = []
+        for month in self._stale_months(partitions, city, counts):
+            start = pd.Timestamp(f"{month}-01")
+            end = start + pd.offsets.MonthBegin(1) - pd.Timedelta(milliseconds=1)
+            frames.append(store.get_processed_features(start_date=start, end_date=end, cities=[city]))
+        frames = [df for df in frames if not df.empty]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def export(self, store, cities=None, full=False):
+        """
+        Copy new processed rows from the online store into a new snapshot.
+
+        Per-month row counts and last timestamps from Mongo pick the months
+        that gained rows since the last export - including older months
+        backfilled later - and only those are read back (everything with
+        full=True). Months whose row count and last timestamp are unchanged
+        are not rewritten. Returns the snapshot version to read (the
+        previous one if nothing changed).
+        """
+        previous = self.load_snapshot() or {'version': 0, 'partitions': {}}
+        version = previous['version'] + 1
+        partitions = dict(previous['partitions'])
+
+        written = 0
+        for city in cities if cities is not None else store.get_cities():
+            if full:
+                df = store.get_processed_features(cities=[city])
+            else:
+                df = self._changed_rows(store, city, partitions)
+            if df.empty:
+                continue
+            df = df.drop(columns=['created_at'], errors='ignore')
+
+            months = df['timestamp'].dt.strftime('%Y-%m')
+            for month, part in df.groupby(months, sort=True):
+                key = f"{city}/{month}"
+                last = str(part['timestamp'].max())
+                if key in partitions and partitions[key]['rows'] == len(part) \
+                        and partitions[key]['max_timestamp'] == last:
+                    continue
+
+                path = self._partition_path(city, month, version)
+                self._write_parquet(part, path)
+                partitions[key] = {
+                    'city': city,
+                    'month': month,
+                    'path': path,
+                    'rows': len(part),
+                    'min_timestamp': str(part['timestamp'].min()),
+                    'max_timestamp': last
+                }
+                written += 1
+
+        if not written:
+            logger.info(f"Offline store up to date at snapshot v{previous['version']}")
+            return previous['version'] or None
+
+        manifest = {
+            'version': version,
+            'created_at': datetime.now().isoformat(),
+            'partitions': partitions
+        }
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        tmp_path = os.path.join(self.snapshot_dir, f"v{version}.json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.snapshot_dir, f"v{version}.json"))
+
+        logger.info(f"Exported {written} partitions to offline store snapshot v{version} "
+                    f"({len(partitions)} partitions total)")
+        return version
+
+    def _write_parquet(self, df, path):
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+        # Atomic write: a snapshot never points at a partial file
+        tmp_path = f"{full_path}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, full_path)
+
+    def read(self, version=None, columns=None, cities=None, start_date=None, end_date=None):
+        """
+        Read a snapshot (the latest if None) sorted by timestamp.
+
+        Partitions outside cities/[start_date, end_date] are skipped without
+        being opened and only the requested columns (plus city and
+        timestamp) are read from each file.
+        """
+        manifest = self.load_snapshot(version)
+        if manifest is None:
+            return pd.DataFrame()
+
+        wanted = None if columns is None else list(dict.fromkeys(['timestamp', 'city', *columns]))
+        frames = []
+        for partition in manifest['partitions'].values():
+            if cities is not None and partition['city'] not in cities:
+                continue
+            if start_date is not None and pd.Timestamp(partition['max_timestamp']) < start_date:
+                continue
+            if end_date is not None and pd.Timestamp(partition['min_timestamp']) > end_date:
+                continue
+
+            path = os.path.join(self.root, partition['path'])
+            present = None
+            if wanted is not None:
+                # Older partitions may predate a feature; it comes back as NaN
+                names = pq.read_schema(path).names
+                present = [col for col in wanted if col in names]
+            frames.append(pq.read_table(path, columns=present).to_pandas())
+
+        if not frames:
+            return pd.DataFrame(columns=wanted)
+
+        df = pd.concat(frames, ignore_index=True)
+        if wanted is not None:
+            df = df.reindex(columns=wanted)
+        if start_date is not None:
+            df = df[df['timestamp'] >= start_date]
+        if end_date is not None:
+            df = df[df['timestamp'] <= end_date]
+        df = df.sort_values(['timestamp', 'city'], kind='stable', ignore_index=True)
+
+        logger.info(f"Read {len(df)} records from offline store snapshot v{manifest['version']} "
+                    f"({len(frames)} partitions)")
+        return apply_dtypes(df, FEATURE_DTYPES)
+
+
+# Global instance
+offline_store = OfflineStore(Config.OFFLINE_STORE_DIR)
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from pymongo import ReplaceOne
+from src.data.schema import AIR_QUALITY_VARIABLES
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Columns summarised in the rollup tiers, and the statistics kept per column
+ROLLUP_COLUMNS = [*AIR_QUALITY_VARIABLES.values(), 'aqi']
+ROLLUP_STATS = ['mean', 'min', 'max', 'p95']
+
+
+def period_start(timestamps, tier):
+    """Start of the daily (midnight) or weekly (Monday midnight) period of each timestamp"""
+    days = timestamps.dt.floor('D')
+    if tier == 'daily':
+        return days
+    if tier == 'weekly':
+        return days - pd.to_timedelta(days.dt.dayofweek, unit='D')
+    raise ValueError(f"Unknown rollup tier: {tier}")
+
+
+def period_end(start, tier):
+    """Exclusive end of the period starting at `start`"""
+    return start + pd.Timedelta(days=1 if tier == 'daily' else 7)
+
+
+def _value(value):
+    return None if pd.isna(value) else float(value)
+
+
+def summarize(df, tier, columns=None):
+    """
+    One rollup document per (city, period) of hourly rows:
+
+        {'city': 'Karachi', 'period_start': 2024-01-01T00:00, 'hours': 24,
+         'stats': {'pm2_5': {'mean': .., 'min': .., 'max': .., 'p95': ..}, ...}}
+
+    `hours` is the number of hourly rows the period was computed from.
+    """
+    columns = [col for col in (columns or ROLLUP_COLUMNS) if col in df.columns]
+    keys = [df['city'], period_start(df['timestamp'], tier).rename('period_start')]
+    grouped = df[columns].astype('float64').groupby(keys, sort=True)
+
+    stats = {
+        'mean': grouped.mean(),
+        'min': grouped.min(),
+        'max': grouped.max(),
+        'p95': grouped.quantile(0.95)
+    }
+    hours = grouped.size()
+
+    documents = []
+    for i, ((city, start), n) in enumerate(hours.items()):
+        documents.append({
+            'city': city,
+            'period_start': start.to_pydatetime(),
+            'hours': int(n),
+            'stats': {col: {name: _value(frame[col].iat[i]) for name, frame in stats.items()}
+                      for col in columns}
+        })
+    return documents
+
+
+class RollupTiers:
+    """
+    Daily and weekly downsampled copies of the hourly raw data, one
+    collection per tier. Periods are recomputed from the stored hours
+    whenever hours inside them are written, so the tiers stay current
+    without a separate compaction job. A recompute that sees fewer hours
+    than the stored rollup (its oldest hours already expired) is skipped,
+    so expiry of the hourly tier never degrades a rollup.
+    """
+
+    def __init__(self, collections):
+        self.collections = collections  # tier -> collection
+
+    @staticmethod
+    def periods(df):
+        """Weekly periods (city, start) touched by a frame of hourly rows"""
+        starts = period_start(df['timestamp'], 'weekly')
+        return sorted(set(zip(df['city'], starts)))
+
+    def update(self, hours, touched=None):
+        """
+        Recompute and upsert the rollups of every period in `hours` (only
+        periods containing a timestamp in `touched` if given). Returns
+        written/skipped document counts.
+        """
+        stats = {'written': 0, 'skipped': 0}
+        if hours.empty:
+            return stats
+
+        now = datetime.now()
+        for tier, collection in self.collections.items():
+            documents = summarize(hours, tier)
+            if touched is not None:
+                wanted = set(zip(touched['city'], period_start(touched['timestamp'], tier)))
+                documents = [doc for doc in documents
+                             if (doc['city'], pd.Timestamp(doc['period_start'])) in wanted]
+            if not documents:
+                continue
+
+            keys = [{'city': doc['city'], 'period_start': doc['period_start']} for doc in documents]
+            existing = {
+                (doc['city'], doc['period_start']): doc['hours']
+                for doc in collection.find({'$or': keys}, projection={'city': 1, 'period_start': 1, 'hours': 1})
+            }
+
+            operations = []
+            for doc in documents:
+                if existing.get((doc['city'], doc['period_start']), 0) > doc['hours']:
+                    stats['skipped'] += 1
+                    continue
+                doc['updated_at'] = now
+                operations.append(ReplaceOne(
+                    {'city': doc['city'], 'period_start': doc['period_start']}, doc, upsert=True
+                ))
+            if operations:
+                collection.bulk_write(operations, ordered=False)
+                stats['written'] += len(operations)
+
+        return stats
+
+    def read(self, tier, cities=None, start_date=None, end_date=None, columns=None):
+        """
+        Rollups of a tier as a flat frame (city, period_start, hours and
+        {column}_{stat} columns) for the periods overlapping
+        [start_date, end_date], oldest first.
+        """
+        if tier not in self.collections:
+            raise ValueError(f"Unknown rollup tier: {tier}")
+
+        query = {}
+        if cities is not None:
+            query['city'] = {'$in': list(cities)}
+        bounds = {}
+        if start_date is not None:
+            bounds['$gte'] = period_start(pd.Series([pd.Timestamp(start_date)]), tier)[0].to_pydatetime()
+        if end_date is not None:
+            bounds['$lte'] = end_date
+        if bounds:
+            query['period_start'] = bounds
+
+        projection = {'_id': 0, 'city': 1, 'period_start': 1, 'hours': 1}
+        for col in columns or ['stats']:
+            projection[col if col == 'stats' else f'stats.{col}'] = 1
+        cursor = self.collections[tier].find(query, projection=projection).sort('period_start', 1)
+
+        rows = []
+        for doc in cursor:
+            row = {'city': doc['city'], 'period_start': doc['period_start'], 'hours': doc['hours']}
+            for col, values in doc.get('stats', {}).items():
+                for name, value in values.items():
+                    row[f'{col}_{name}'] = np.nan if value is None else value
+            rows.append(row)
+
+        flat = ['city', 'period_start', 'hours']
+        for col in columns or ROLLUP_COLUMNS:
+            flat.extend(f'{col}_{name}' for name in ROLLUP_STATS)
+        df = pd.DataFrame(rows).reindex(columns=flat)
+        return df.astype({col: 'float32' for col in flat[3:]})
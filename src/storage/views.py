@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from pymongo import ReplaceOne, UpdateOne
+from src.storage.mongodb_client import mongodb_client
+from src.data.aqi import AQI_CATEGORIES, aqi_category
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+HOURS_PER_DAY = 24
+CATEGORY_LABELS = [label for label, _ in AQI_CATEGORIES]
+
+
+def _value(value):
+    return None if pd.isna(value) else float(value)
+
+
+def daily_documents(df, source):
+    """
+    One daily view document per (city, day) of hourly AQI rows:
+
+        {'source': 'actual', 'city': 'Karachi', 'date': 2024-01-01T00:00,
+         'hours': 24, 'min': .., 'max': .., 'mean': ..,
+         'hourly': [24 values, None where missing],
+         'categories': {'Good': 10, 'Moderate': 14}}
+    """
+    df = df[['city', 'timestamp', 'aqi']].dropna(subset=['aqi'])
+    days = df['timestamp'].dt.floor('D')
+    hours = df['timestamp'].dt.hour.to_numpy()
+    categories = aqi_category(df['aqi'])
+
+    documents = []
+    for (city, day), index in df.groupby([df['city'], days], sort=True).indices.items():
+        values = df['aqi'].to_numpy(dtype='float64')[index]
+        hourly = [None] * HOURS_PER_DAY
+        for hour, value in zip(hours[index], values):
+            hourly[hour] = float(value)
+        labels, counts = np.unique(categories[index].astype(str), return_counts=True)
+
+        documents.append({
+            'source': source,
+            'city': city,
+            'date': day.to_pydatetime(),
+            'hours': len(index),
+            'min': _value(values.min()),
+            'max': _value(values.max()),
+            'mean': _value(values.mean()),
+            'hourly': hourly,
+            'categories': {label: int(n) for label, n in zip(labels, counts)}
+        })
+    return documents
+
+
+def _profile_delta(old, new):
+    """$inc that moves a city profile from a day's old document to its new one"""
+    delta = {}
+
+    def add(field, value):
+        delta[field] = delta.get(field, 0) + value
+
+    for sign, doc in ((-1, old), (1, new)):
+        if doc is None:
+            continue
+        for hour, value in enumerate(doc['hourly']):
+            if value is not None:
+                add(f'profile.{hour}.hours', sign)
+                add(f'profile.{hour}.sum', sign * value)
+        for label, n in doc['categories'].items():
+            add(f'categories.{label}', sign * n)
+    if old is None:
+        add('days', 1)
+    return {field: value for field, value in delta.items() if value}
+
+
+class AggregateViews:
+    """
+    Materialized AQI summaries, maintained as part of each write so that
+    dashboards and reports read a handful of documents instead of
+    aggregating hourly rows:
+
+    - daily stats: one document per (source, city, day) with min/max/mean,
+      the 24 hourly values and hours per AQI category
+    - city profiles: one document per (source, city) with the hour-of-day
+      profile (hours and sum per hour) and hours per category over all days
+
+    source is 'actual' (stored raw hours) or 'predicted' (the latest
+    forecast for each day). A day is recomputed from all of its hours on
+    every write and the change folded into the city profile, so re-saving
+    hours never double counts.
+    """
+
+    def __init__(self, db):
+        self.daily_collection = db[Config.DAILY_STATS_COLLECTION]
+        self.profile_collection = db[Config.CITY_PROFILE_COLLECTION]
+
+    def update(self, source, df, touched=None):
+        """
+        Recompute the daily documents of the days in df (only days with a
+        timestamp in `touched` if given) and update the city profiles.
+        For actual AQI a recompute from fewer hours than stored (e.g. after
+        the oldest raw hours expired) is skipped. Predicted hours never
+        expire: each run forecasts whole days from tomorrow, so as the start
+        date moves forward the days it still covers are predicted again, and
+        the newer forecast replaces the stored one whatever its hour count.
+        Returns written/skipped counts.
+        """
+        stats = {'written': 0, 'skipped': 0}
+        if df.empty:
+            return stats
+
+        if 'city' not in df.columns:
+            df = df.assign(city=Config.CITY_NAME)
+        documents = daily_documents(df, source)
+        if touched is not None:
+            wanted = set(zip(touched['city'], touched['timestamp'].dt.floor('D')))
+            documents = [doc for doc in documents if (doc['city'], pd.Timestamp(doc['date'])) in wanted]
+        if not documents:
+            return stats
+
+        keys = [{'source': source, 'city': doc['city'], 'date': doc['date']} for doc in documents]
+        existing = {
+            (doc['city'], doc['date']): doc
+            for doc in self.daily_collection.find(
+                {'$or': keys}, projection={'city': 1, 'date': 1, 'hours': 1, 'hourly': 1, 'categories': 1}
+            )
+        }
+
+        now = datetime.now()
+        operations, deltas = [], {}
+        for key, doc in zip(keys, documents):
+            old = existing.get((doc['city'], doc['date']))
+            # Fewer actual hours means the oldest ones expired; a newer forecast supersedes the stored one
+            shrunk = source == 'actual' and old is not None and old['hours'] > doc['hours']
+            if shrunk or (old is not None and old['hourly'] == doc['hourly']):
+                stats['skipped'] += 1
+                continue
+
+            doc['updated_at'] = now
+            operations.append(ReplaceOne(key, doc, upsert=True))
+            city_delta = deltas.setdefault(doc['city'], {})
+            for field, value in _profile_delta(old, doc).items():
+                city_delta[field] = city_delta.get(field, 0) + value
+
+        if operations:
+            self.daily_collection.bulk_write(operations, ordered=False)
+            self.profile_collection.bulk_write([
+                UpdateOne({'source': source, 'city': city},
+                          {'$inc': delta, '$set': {'updated_at': now}}, upsert=True)
+                for city, delta in deltas.items()
+            ], ordered=False)
+            stats['written'] += len(operations)
+
+        return stats
+
+    def daily(self, source, cities=None, start_date=None, end_date=None):
+        """
+        Daily stats of the days in [start_date, end_date], oldest first:
+        city, date, hours, min, mean, max and one column of hours per AQI
+        category.
+        """
+        query = {'source': source}
+        if cities is not None:
+            query['city'] = {'$in': list(cities)}
+        bounds = {}
+        if start_date is not None:
+            bounds['$gte'] = pd.Timestamp(start_date).floor('D').to_pydatetime()
+        if end_date is not None:
+            bounds['$lte'] = pd.Timestamp(end_date).to_pydatetime()
+        if bounds:
+            query['date'] = bounds
+
+        cursor = self.daily_collection.find(query, projection={'_id': 0, 'hourly': 0}).sort('date', 1)
+        rows = []
+        for doc in cursor:
+            row = {field: doc[field] for field in ('city', 'date', 'hours', 'min', 'mean', 'max')}
+            row.update({label: doc['categories'].get(label, 0) for label in CATEGORY_LABELS})
+            rows.append(row)
+
+        columns = ['city', 'date', 'hours', 'min', 'mean', 'max', *CATEGORY_LABELS]
+        return pd.DataFrame(rows, columns=columns)
+
+    def hourly(self, source, city, date):
+        """The 24 hourly values of one city-day (NaN where missing), indexed by timestamp"""
+        date = pd.Timestamp(date).floor('D')
+        doc = self.daily_collection.find_one(
+            {'source': source, 'city': city, 'date': date.to_pydatetime()}, projection={'hourly': 1}
+        )
+        values = doc['hourly'] if doc else [None] * HOURS_PER_DAY
+        index = pd.date_range(date, periods=HOURS_PER_DAY, freq='h', name='timestamp')
+        return pd.Series(values, index=index, dtype='float64', name=source)
+
+    def _profile(self, source, city):
+        return self.profile_collection.find_one({'source': source, 'city': city}) or {}
+
+    def hour_of_day_profile(self, source, city):
+        """Mean AQI and hours seen for each hour of the day (0-23)"""
+        profile = self._profile(source, city).get('profile', {})
+        hours = np.array([profile.get(str(hour), {}).get('hours', 0) for hour in range(HOURS_PER_DAY)])
+        sums = np.array([profile.get(str(hour), {}).get('sum', 0.0) for hour in range(HOURS_PER_DAY)])
+        mean = np.full(HOURS_PER_DAY, np.nan)
+        np.divide(sums, hours, out=mean, where=hours > 0)
+        return pd.DataFrame({'hour': np.arange(HOURS_PER_DAY), 'hours': hours, 'mean': mean})
+
+    def category_hours(self, source, city):
+        """Hours spent in each AQI category over all days"""
+        categories = self._profile(source, city).get('categories', {})
+        return pd.Series({label: categories.get(label, 0) for label in CATEGORY_LABELS}, name='hours')
+
+
+# Global instance
+aggregate_views = AggregateViews(mongodb_client.get_feature_store())
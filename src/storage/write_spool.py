@@ -0,0 +1,178 @@
+import io
+import os
+import time
+import sqlite3
+import threading
+import pandas as pd
+from src.data.feature_cache import write_frame, read_frame
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Longest wait between flush attempts while MongoDB keeps failing
+MAX_RETRY_SECONDS = 60
+
+
+class SpoolFullError(Exception):
+    """The spool stayed over its size cap for longer than the append was allowed to wait"""
+
+
+class WriteSpool:
+    """
+    Durable local queue in front of the feature store writes.
+
+    append() stores a frame in a SQLite database (WAL journal, synced on
+    commit) and returns; a background thread drains the queue oldest
+    first, merging queued frames of the same kind into batches of up to
+    batch_rows rows, and hands each batch to writers[kind]. An entry is
+    only deleted after its write succeeded, so a crash or outage at any
+    point replays it later (writes are upserts, replays are harmless).
+    Failed writes are retried with exponential backoff.
+
+    Backpressure: while the queued payloads exceed max_bytes, append()
+    waits up to block_seconds for the flusher to make room and then raises
+    SpoolFullError rather than growing without bound.
+    """
+
+    def __init__(self, path, writers, max_bytes=512 * 1024 * 1024, batch_rows=50_000, block_seconds=60):
+        self.path = path
+        self.writers = writers  # kind -> callable(df), raises on failure
+        self.max_bytes = max_bytes
+        self.batch_rows = batch_rows
+        self.block_seconds = block_seconds
+        self.stats = {'appended': 0, 'flushed': 0, 'batches': 0, 'failures': 0, 'blocked': 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, rows INTEGER NOT NULL, "
+            "size INTEGER NOT NULL, payload BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+
+        self._cond = threading.Condition()
+        self._thread = None
+        self._failures = 0
+
+        pending = self.pending()
+        if pending['entries']:
+            logger.info(f"Write spool has {pending['entries']} entries ({pending['rows']} rows) "
+                        f"left from an earlier run")
+            self._start_flusher()
+
+    def pending(self):
+        """Entries, rows and payload bytes waiting to be flushed"""
+        with self._cond:
+            entries, rows, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(rows), 0), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {'entries': entries, 'rows': rows, 'bytes': size}
+
+    def append(self, kind, df):
+        """Stage a frame for writing; returns once it is durable on local disk"""
+        if kind not in self.writers:
+            raise ValueError(f"Unknown spool entry kind: {kind}")
+        if df.empty:
+            return
+
+        buffer = io.BytesIO()
+        write_frame(buffer, df.reset_index(drop=True))
+        payload = buffer.getvalue()
+
+        with self._cond:
+            deadline = time.monotonic() + self.block_seconds
+            while self._size() + len(payload) > self.max_bytes and self._size() > 0:
+                self.stats['blocked'] += 1
+                self._start_flusher()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise SpoolFullError(f"Write spool over {self.max_bytes} bytes for {self.block_seconds}s")
+                self._cond.wait(remaining)
+
+            self._conn.execute(
+                "INSERT INTO entries (kind, rows, size, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, len(df), len(payload), payload, time.time())
+            )
+            self.stats['appended'] += len(df)
+            self._start_flusher()
+
+    def flush(self, timeout=None):
+        """Wait until the spool is empty (or timeout seconds pass); True if it drained"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._start_flusher()
+            while self._has_entries():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _size(self):
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _has_entries(self):
+        return self._conn.execute("SELECT 1 FROM entries LIMIT 1").fetchone() is not None
+
+    def _start_flusher(self):
+        # Called with self._cond held
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='write-spool-flusher', daemon=True)
+            self._thread.start()
+
+    def _next_batch(self):
+        """Oldest entry's kind and the ids/payloads of that kind to write together"""
+        first = self._conn.execute("SELECT kind FROM entries ORDER BY id LIMIT 1").fetchone()
+        if first is None:
+            return None, [], []
+
+        ids, payloads, rows = [], [], 0
+        cursor = self._conn.execute("SELECT id, rows, payload FROM entries WHERE kind = ? ORDER BY id",
+                                    (first[0],))
+        for entry_id, entry_rows, payload in cursor:
+            if ids and rows + entry_rows > self.batch_rows:
+                break
+            ids.append(entry_id)
+            payloads.append(payload)
+            rows += entry_rows
+        return first[0], ids, payloads
+
+    def _run(self):
+        while True:
+            with self._cond:
+                kind, ids, payloads = self._next_batch()
+                if not ids:
+                    # Decided under the lock, so an append can never be left unflushed
+                    self._thread = None
+                    self._cond.notify_all()
+                    return
+
+            try:
+                df = pd.concat([read_frame(io.BytesIO(payload)) for payload in payloads], ignore_index=True)
+                if len(payloads) > 1 and {'city', 'timestamp'} <= set(df.columns):
+                    # Later entries win, as if the writes had been made one by one
+                    df = df.drop_duplicates(['city', 'timestamp'], keep='last', ignore_index=True)
+                self.writers[kind](df)
+            except Exception as e:
+                self._failures += 1
+                self.stats['failures'] += 1
+                delay = min(MAX_RETRY_SECONDS, 2 ** (self._failures - 1))
+                logger.warning(f"Write spool flush of {len(ids)} {kind} entries failed "
+                               f"(retrying in {delay}s): {e}")
+                time.sleep(delay)
+                continue
+
+            with self._cond:
+                self._conn.execute(f"DELETE FROM entries WHERE id IN ({','.join('?' * len(ids))})", ids)
+                self._failures = 0
+                self.stats['flushed'] += len(df)
+                self.stats['batches'] += 1
+                self._cond.notify_all()
+            logger.info(f"Write spool flushed {len(df)} {kind} rows from {len(ids)} entries")
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,56 @@
+import json
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+_registry = None
+
+
+def load_cities(path=None):
+    """Load the city registry from a JSON file, defaulting to the configured city"""
+    path = path or Config.CITIES_FILE
+
+    if not path:
+        return [{
+            'name': Config.CITY_NAME,
+            'latitude': Config.LATITUDE,
+            'longitude': Config.LONGITUDE,
+            'timezone': Config.TIMEZONE
+        }]
+
+    with open(path) as f:
+        entries = json.load(f)
+
+    cities = []
+    for entry in entries:
+        cities.append({
+            'name': entry['name'],
+            'latitude': float(entry['latitude']),
+            'longitude': float(entry['longitude']),
+            'timezone': entry.get('timezone', Config.TIMEZONE)
+        })
+
+    names = [city['name'] for city in cities]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate city names in {path}")
+
+    logger.info(f"Loaded {len(cities)} cities from {path}")
+    return cities
+
+
+def get_cities(names=None):
+    """Registered cities, optionally restricted to the given names"""
+    global _registry
+    if _registry is None:
+        _registry = load_cities()
+
+    if names is None:
+        return list(_registry)
+
+    by_name = {city['name']: city for city in _registry}
+    missing = [name for name in names if name not in by_name]
+    if missing:
+        raise KeyError(f"Unknown cities: {missing}")
+
+    return [by_name[name] for name in names]
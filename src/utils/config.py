@@ -14,6 +14,49 @@ class Config:
     LATITUDE = float(os.getenv('LATITUDE', '24.8607'))
     LONGITUDE = float(os.getenv('LONGITUDE', '67.0011'))
     CITY_NAME = os.getenv('CITY_NAME', 'Karachi')
+    TIMEZONE = os.getenv('TIMEZONE', 'Asia/Karachi')
+    
+    # Multi-city registry: JSON list of {name, latitude, longitude[, timezone]}.
+    # Unset = the single city above.
+    CITIES_FILE = os.getenv('CITIES_FILE')
+    CITY_BATCH_SIZE = int(os.getenv('CITY_BATCH_SIZE', '50'))
+    
+    AIR_QUALITY_API_URL = os.getenv('AIR_QUALITY_API_URL', 'https://air-quality-api.open-meteo.com/v1/air-quality')
+    FORECAST_API_URL = os.getenv('FORECAST_API_URL', 'https://api.open-meteo.com/v1/forecast')
+    ARCHIVE_API_URL = os.getenv('ARCHIVE_API_URL', 'https://archive-api.open-meteo.com/v1/archive')
+    
+    # HTTP response cache (finalized archive responses never expire, others after the TTL)
+    HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', 'true').lower() == 'true'
+    HTTP_CACHE_DIR = os.getenv('HTTP_CACHE_DIR', 'data/cache/http')
+    HTTP_CACHE_TTL_SECONDS = int(os.getenv('HTTP_CACHE_TTL_SECONDS', '900'))
+    HTTP_CACHE_MAX_BYTES = int(os.getenv('HTTP_CACHE_MAX_BYTES', str(500 * 1024 * 1024)))
+    
+    # Feature frame cache (keyed by the raw input window + feature code version)
+    FEATURE_CACHE_ENABLED = os.getenv('FEATURE_CACHE_ENABLED', 'true').lower() == 'true'
+    FEATURE_CACHE_DIR = os.getenv('FEATURE_CACHE_DIR', 'data/cache/features')
+    FEATURE_CACHE_MAX_BYTES = int(os.getenv('FEATURE_CACHE_MAX_BYTES', str(1024 * 1024 * 1024)))
+    
+    # Local model cache (keyed by registry document _id + content hash)
+    MODEL_CACHE_ENABLED = os.getenv('MODEL_CACHE_ENABLED', 'true').lower() == 'true'
+    MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', 'data/cache/models')
+    MODEL_CACHE_MAX_BYTES = int(os.getenv('MODEL_CACHE_MAX_BYTES', str(2 * 1024 * 1024 * 1024)))
+    MODEL_CACHE_MMAP = os.getenv('MODEL_CACHE_MMAP', 'true').lower() == 'true'
+    
+    # Open-Meteo request scheduling (per endpoint)
+    API_RATE_PER_SECOND = float(os.getenv('API_RATE_PER_SECOND', '5'))
+    API_BURST = int(os.getenv('API_BURST', '10'))
+    API_MAX_CONCURRENCY = int(os.getenv('API_MAX_CONCURRENCY', '8'))
+    API_MAX_RETRIES = int(os.getenv('API_MAX_RETRIES', '5'))
+    
+    # Gap filling for raw measurements: ffill | interpolate | seasonal
+    # (derived features are always forward-filled; interpolate looks at the next reading)
+    FILL_STRATEGY = os.getenv('FILL_STRATEGY', 'ffill')
+    FILL_MAX_GAP_HOURS = int(os.getenv('FILL_MAX_GAP_HOURS', '6'))  # keep below LOOKBACK_HOURS
+    
+    # Parquet offline store for training (TRAINING_SNAPSHOT pins a snapshot version)
+    OFFLINE_STORE_ENABLED = os.getenv('OFFLINE_STORE_ENABLED', 'true').lower() == 'true'
+    OFFLINE_STORE_DIR = os.getenv('OFFLINE_STORE_DIR', 'data/offline')
+    TRAINING_SNAPSHOT = int(os.environ['TRAINING_SNAPSHOT']) if os.getenv('TRAINING_SNAPSHOT') else None
     
     # Model Configuration
     MODELS = ['random_forest', 'xgboost', 'lightgbm']
@@ -21,10 +64,42 @@ class Config:
     
     # Data Collection
     HISTORICAL_MONTHS = 4  # Collect 4 months of data
+    BACKFILL_WINDOW_DAYS = int(os.getenv('BACKFILL_WINDOW_DAYS', '30'))
+    BACKFILL_MAX_WORKERS = int(os.getenv('BACKFILL_MAX_WORKERS', '4'))
+    BACKFILL_CHECKPOINT_PATH = os.getenv('BACKFILL_CHECKPOINT_PATH', 'data/backfill_checkpoint.json')
     
     # Collection Names
     RAW_DATA_COLLECTION = 'raw_data'
     PROCESSED_FEATURES_COLLECTION = 'processed_features'
     MODELS_COLLECTION = 'models'
     MODEL_METRICS_COLLECTION = 'model_metrics'
-    PREDICTIONS_COLLECTION = 'predictions'
\ No newline at end of file
+    PREDICTIONS_COLLECTION = 'predictions'
+    FEATURE_STATE_COLLECTION = 'feature_state'
+    STORE_METADATA_COLLECTION = 'store_metadata'
+    RAW_BUCKET_COLLECTION = 'raw_data_daily'
+    PROCESSED_BUCKET_COLLECTION = 'processed_features_daily'
+    DAILY_ROLLUP_COLLECTION = 'raw_rollups_daily'
+    WEEKLY_ROLLUP_COLLECTION = 'raw_rollups_weekly'
+    DAILY_STATS_COLLECTION = 'daily_aqi_stats'
+    CITY_PROFILE_COLLECTION = 'city_aqi_profiles'
+    
+    # Retention tiers in days (0 = keep forever); expiry is done by TTL indexes.
+    # Processed features only expire in runs that exported them to the offline store.
+    RETENTION_HOURLY_DAYS = int(os.getenv('RETENTION_HOURLY_DAYS', '0'))
+    RETENTION_PROCESSED_DAYS = int(os.getenv('RETENTION_PROCESSED_DAYS', '0'))
+    RETENTION_DAILY_DAYS = int(os.getenv('RETENTION_DAILY_DAYS', '730'))
+    RETENTION_WEEKLY_DAYS = int(os.getenv('RETENTION_WEEKLY_DAYS', '0'))
+    
+    # Feature store layout: hourly (one document per city-hour) | bucketed (one per city-day)
+    FEATURE_STORE_LAYOUT = os.getenv('FEATURE_STORE_LAYOUT', 'hourly')
+    
+    # Feature store writes: documents per unordered bulk upsert
+    WRITE_BATCH_SIZE = int(os.getenv('WRITE_BATCH_SIZE', '1000'))
+    
+    # Local write spool (SQLite) in front of the feature store writes
+    WRITE_SPOOL_ENABLED = os.getenv('WRITE_SPOOL_ENABLED', 'true').lower() == 'true'
+    WRITE_SPOOL_PATH = os.getenv('WRITE_SPOOL_PATH', 'data/spool/writes.db')
+    WRITE_SPOOL_MAX_BYTES = int(os.getenv('WRITE_SPOOL_MAX_BYTES', str(512 * 1024 * 1024)))
+    WRITE_SPOOL_BATCH_ROWS = int(os.getenv('WRITE_SPOOL_BATCH_ROWS', '50000'))
+    WRITE_SPOOL_BLOCK_SECONDS = int(os.getenv('WRITE_SPOOL_BLOCK_SECONDS', '60'))
+    WRITE_SPOOL_DRAIN_SECONDS = int(os.getenv('WRITE_SPOOL_DRAIN_SECONDS', '600'))
\ No newline at end of file
@@ -0,0 +1,146 @@
+import os
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """
+    Size-bounded on-disk key -> value store, the base of the local caches.
+
+    Each entry is one file under cache_dir (sharded by the first two key
+    characters), written atomically. When the cache grows past max_bytes
+    the least recently used entries are evicted (file mtime doubles as the
+    access time, so the LRU order survives restarts).
+
+    Subclasses name their files with `suffix`, implement _write(f, value)
+    and _read(path), and may override _expired(value, now); callers go
+    through load(key) / store(key, value).
+    """
+
+    suffix = ''
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'stores': 0, 'evictions': 0}
+
+        self._lock = threading.Lock()
+        self._index = {}  # key -> [size, last_access]
+        self._total_bytes = 0
+        self._load_index()
+
+    def _write(self, f, value):
+        raise NotImplementedError
+
+    def _read(self, path):
+        raise NotImplementedError
+
+    def _expired(self, value, now):
+        return False
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}{self.suffix}")
+
+    def _load_index(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(self.suffix):
+                    continue
+                stat = os.stat(os.path.join(root, name))
+                self._index[name[:-len(self.suffix)]] = [stat.st_size, stat.st_mtime]
+                self._total_bytes += stat.st_size
+
+    def _forget(self, key):
+        entry = self._index.pop(key, None)
+        if entry:
+            self._total_bytes -= entry[0]
+
+    def load(self, key):
+        """Return the cached value, or None on a miss/expired entry"""
+        path = self._path(key)
+
+        try:
+            value = self._read(path)
+        except Exception:
+            # Missing, truncated (e.g. by a full disk) or otherwise unreadable
+            with self._lock:
+                self._forget(key)
+                self.stats['misses'] += 1
+            return None
+
+        now = time.time()
+        if self._expired(value, now):
+            with self._lock:
+                self._forget(key)
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+
+        with self._lock:
+            if key in self._index:
+                self._index[key][1] = now
+            self.stats['hits'] += 1
+
+        return value
+
+    def store(self, key, value):
+        """Store a value and evict LRU entries past the size cap"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Atomic write so concurrent readers never see a partial file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            self._write(f, value)
+        os.replace(tmp_path, path)
+
+        size = os.path.getsize(path)
+        with self._lock:
+            self._forget(key)
+            self._index[key] = [size, time.time()]
+            self._total_bytes += size
+            self.stats['stores'] += 1
+            self._evict()
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        for key, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            self._forget(key)
+            self.stats['evictions'] += 1
+
+    def size_bytes(self):
+        """Total bytes currently held in the cache"""
+        return self._total_bytes
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            for key in list(self._index):
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+                self._forget(key)
@@ -0,0 +1,41 @@
+import sys
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def memory_report(df):
+    """Bytes per column and for the whole frame (index included)"""
+    columns = df.memory_usage(deep=True, index=False)
+    return {
+        'rows': len(df),
+        'total_bytes': int(columns.sum() + df.index.memory_usage(deep=True)),
+        'columns': {col: int(size) for col, size in columns.items()}
+    }
+
+
+def format_memory_report(report, top=5):
+    """One-line summary: total size and the largest columns"""
+    largest = sorted(report['columns'].items(), key=lambda item: item[1], reverse=True)[:top]
+    columns = ', '.join(f"{col}={size / 1e6:.1f}MB" for col, size in largest)
+    return (f"{report['total_bytes'] / 1e6:.1f} MB for {report['rows']} rows x "
+            f"{len(report['columns'])} columns (largest: {columns})")
+
+
+def log_memory(df, name):
+    """Log a frame's memory report"""
+    logger.info(f"Memory [{name}]: {format_memory_report(memory_report(df))}")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
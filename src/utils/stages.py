@@ -0,0 +1,62 @@
+import time
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StageTimer:
+    """
+    Start/end offsets of the stages of an async pipeline run.
+
+    Wrap each awaitable in stage(); overlapping stages show up as
+    overlapping [start, end] intervals, and report() compares the time the
+    stages actually covered with what they would take back to back.
+    """
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.stages = {}  # name -> (start_ms, end_ms)
+
+    async def stage(self, name, awaitable):
+        """Await one stage and record when it started and finished"""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.stages[name] = ((start - self.t0) * 1000, (time.perf_counter() - self.t0) * 1000)
+
+    def thread(self, name, func, *args, **kwargs):
+        """A blocking call (e.g. an HTTP fetch or feature computation) as a stage run in a worker thread"""
+        return self.stage(name, asyncio.to_thread(func, *args, **kwargs))
+
+    def report(self):
+        """
+        Per-stage durations and offsets, the time covered by at least one
+        stage, its back-to-back (sequential) sum and the time saved by overlap
+        """
+        durations = {name: end - start for name, (start, end) in self.stages.items()}
+
+        # Length of the union of the stage intervals
+        staged_ms, reach = 0.0, 0.0
+        for start, end in sorted(self.stages.values()):
+            staged_ms += max(0.0, end - max(start, reach))
+            reach = max(reach, end)
+
+        sequential_ms = sum(durations.values())
+        return {
+            'stages_ms': durations,
+            'offsets_ms': dict(self.stages),
+            'wall_ms': (time.perf_counter() - self.t0) * 1000,
+            'staged_ms': staged_ms,
+            'sequential_ms': sequential_ms,
+            'saved_ms': sequential_ms - staged_ms
+        }
+
+
+def format_stage_timings(report):
+    """One-line summary of a StageTimer report"""
+    stages = ', '.join(f"{name} {start:.0f}-{end:.0f} ms" for name, (start, end) in report['offsets_ms'].items())
+    return (f"{stages} | stages {report['staged_ms']:.0f} ms vs sequential "
+            f"{report['sequential_ms']:.0f} ms (saved {report['saved_ms']:.0f} ms), "
+            f"wall {report['wall_ms']:.0f} ms")
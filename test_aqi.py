@@ -0,0 +1,29 @@
+import numpy as np
+from src.data.aqi import BREAKPOINTS, UNIT_SCALE, compute_sub_index
+
+
+def _decimals(pollutant):
+    """Reporting precision of a breakpoint table (decimals of its concentrations)"""
+    values = [c for row in BREAKPOINTS[pollutant] for c in row[:2]]
+    return max(len(f"{c:g}".partition('.')[2]) for c in values)
+
+
+def test_sub_index_never_decreases():
+    """Sub-indices are non-decreasing at the table's precision, across every segment boundary"""
+    for pollutant, rows in BREAKPOINTS.items():
+        step = 10.0 ** -_decimals(pollutant)
+        ppm = np.round(np.arange(0, rows[-1][1] + step, step), _decimals(pollutant))
+        sub_index = compute_sub_index(pollutant, ppm / UNIT_SCALE[pollutant])
+
+        drops = np.flatnonzero(np.diff(sub_index) < -1e-3)
+        assert not len(drops), (
+            f"{pollutant}: sub-index drops from {sub_index[drops[0]]:.2f} at {ppm[drops[0]]} "
+            f"to {sub_index[drops[0] + 1]:.2f} at {ppm[drops[0] + 1]}"
+        )
+        print(f"✅ {pollutant}: non-decreasing over {len(ppm)} concentrations")
+
+
+if __name__ == "__main__":
+    print("Testing AQI breakpoint tables...")
+    print("=" * 50)
+    test_sub_index_never_decreases()
@@ -1,47 +1,42 @@
-from src.data.fetch_data import fetch_latest_data
-from src.storage.mongodb_client import mongodb_client
+from src.storage.views import aggregate_views
 from src.utils.config import Config
 from datetime import datetime
 import pandas as pd
 
-print("Fetching ACTUAL current AQI...")
+print("Loading ACTUAL and PREDICTED daily stats...")
 
-# Get today's actual data
-df_actual = fetch_latest_data()
+# Current date
+today = pd.Timestamp(datetime.now().date())
 
-print(f"\n📊 Today's ACTUAL AQI (from Open-Meteo):")
-print(f"Date: {df_actual['timestamp'].max().date()}")
-print(f"Current hour AQI: {df_actual['aqi'].iloc[-1]:.2f}")
-print(f"Today's average: {df_actual['aqi'].mean():.2f}")
-print(f"Range: {df_actual['aqi'].min():.2f} - {df_actual['aqi'].max():.2f}")
+# Materialized daily stats: one indexed lookup each, no hourly rows pulled
+actual = aggregate_views.daily('actual', cities=[Config.CITY_NAME], start_date=today, end_date=today)
+predicted = aggregate_views.daily('predicted', cities=[Config.CITY_NAME], start_date=today, end_date=today)
 
-# Get predictions for TODAY from MongoDB
-prediction_db = mongodb_client.get_prediction_store()
-prediction_collection = prediction_db[Config.PREDICTIONS_COLLECTION]
+if actual.empty:
+    print("\n⚠️ No actual data stored for today yet - run the feature pipeline first.")
+    raise SystemExit(1)
 
-# Current date
-today = datetime.now().date()
+actual_today = actual.iloc[0]
+actual_hourly = aggregate_views.hourly('actual', Config.CITY_NAME, today)
 
-# Get predictions that were made BEFORE today, FOR today
-predictions_for_today = list(prediction_collection.find({
-    'timestamp': {
-        '$gte': pd.Timestamp(today).to_pydatetime(),
-        '$lt': pd.Timestamp(today + pd.Timedelta(days=1)).to_pydatetime()
-    }
-}).sort('timestamp', 1))
+print(f"\n📊 Today's ACTUAL AQI (from the feature store):")
+print(f"Date: {today.date()}")
+print(f"Latest hour AQI: {actual_hourly.dropna().iloc[-1]:.2f}")
+print(f"Today's average: {actual_today['mean']:.2f}")
+print(f"Range: {actual_today['min']:.2f} - {actual_today['max']:.2f}")
 
-if len(predictions_for_today) > 0:
-    df_pred = pd.DataFrame(predictions_for_today)
+if not predicted.empty:
+    predicted_today = predicted.iloc[0]
+    predicted_hourly = aggregate_views.hourly('predicted', Config.CITY_NAME, today)
     
     print(f"\n🤖 MODEL PREDICTIONS FOR TODAY:")
-    print(f"Number of hourly predictions: {len(df_pred)}")
-    print(f"Average predicted AQI: {df_pred['predicted_aqi'].mean():.2f}")
-    print(f"Range: {df_pred['predicted_aqi'].min():.2f} - {df_pred['predicted_aqi'].max():.2f}")
-    print(f"Prediction created at: {df_pred['created_at'].iloc[0]}")
+    print(f"Number of hourly predictions: {predicted_today['hours']}")
+    print(f"Average predicted AQI: {predicted_today['mean']:.2f}")
+    print(f"Range: {predicted_today['min']:.2f} - {predicted_today['max']:.2f}")
     
     # Compare averages
-    actual_avg = df_actual['aqi'].mean()
-    predicted_avg = df_pred['predicted_aqi'].mean()
+    actual_avg = actual_today['mean']
+    predicted_avg = predicted_today['mean']
     difference = abs(actual_avg - predicted_avg)
     percentage_error = (difference / actual_avg) * 100
     
@@ -60,24 +55,16 @@ if len(predictions_for_today) > 0:
     else:
         print("❌ HIGH error (>30%)")
         
-    # Hour-by-hour comparison (if we have matching hours)
+    # Hour-by-hour comparison (hours with both an actual and a predicted value)
     print(f"\n🕐 HOURLY COMPARISON:")
-    for idx, pred_row in df_pred.head(5).iterrows():
-        pred_time = pred_row['timestamp']
-        pred_aqi = pred_row['predicted_aqi']
-        
-        # Find matching actual hour
-        actual_matches = df_actual[df_actual['timestamp'] == pred_time]
-        if len(actual_matches) > 0:
-            actual_aqi = actual_matches['aqi'].iloc[0]
-            error = abs(pred_aqi - actual_aqi)
-            print(f"  {pred_time.strftime('%H:%M')}: Predicted {pred_aqi:.1f}, Actual {actual_aqi:.1f}, Error {error:.1f}")
+    hourly = pd.concat([predicted_hourly, actual_hourly], axis=1).dropna()
+    for pred_time, row in hourly.head(5).iterrows():
+        error = abs(row['predicted'] - row['actual'])
+        print(f"  {pred_time.strftime('%H:%M')}: Predicted {row['predicted']:.1f}, Actual {row['actual']:.1f}, Error {error:.1f}")
         
 else:
     print("\n⚠️ No predictions found for today!")
-    print("Your predictions are for future dates (Feb 3).")
-    print("\nThis is expected behavior - the model predicts 3 days AHEAD.")
+    print("Predictions start the day after each inference run.")
     print("\n💡 To validate:")
-    print("1. Wait until Feb 3")
-    print("2. Run this script on Feb 3 to compare predicted vs actual")
-    print("3. Or compare older predictions with historical actual data")
\ No newline at end of file
+    print("1. Run the inference pipeline today")
+    print("2. Run this script tomorrow to compare predicted vs actual")